@@ -1,9 +1,13 @@
 import streamlit as st
 import pandas as pd
 import preprocessing_model
-import yfinance as yf
+import forecast_engine
+import price_store
 import datetime
 import helper
+import data_table
+import tuning
+import features as feature_store
 import numpy as np
 from sklearn.metrics import mean_absolute_error , mean_squared_error , mean_absolute_percentage_error , r2_score
 
@@ -32,44 +36,113 @@ def Forecasting(stock):
     
     forecast = st.slider(label="How many days would you like to forecast ? ", min_value=1 , max_value=30, step=1)
 
-    data = yf.download(stock , start=start , end=end)
+    data = price_store.load_prices(stock , start=start , end=end)
 
     with st.container(border=True):
         st.title("Customize Your LSTM Model : ")
 
         train_len = st.select_slider(label="train size" ,options=[f"{i}%" for i in range(10, 101, 10)])
+        fit_mode = st.radio(label="Fit Mode" , options=["quick" , "balanced" , "thorough" , "custom"] , index=1 , horizontal=True ,
+                            help="quick / balanced / thorough pick batch size, max epochs and learning rate; custom uses the values below. All modes stop early once validation loss stops improving.")
         activation = st.selectbox( label='Activation Function for Dense Layers',options=['relu', 'sigmoid', 'tanh','linear'])
 
         col1 , col2 , col3 = st.columns(3)
 
         with col1 :
-            learning_rate = st.selectbox(label='Learning Rate', options=[0.1 ,0.01 , 0.001, 0.0001])
+            learning_rate = st.selectbox(label='Learning Rate', options=[0.1 ,0.01 , 0.001, 0.0001] , index=2)
             window = st.selectbox(label="Window Size" , options=[20,40,60,80,100,120,140,180])
         with col2 :
             optimizer = st.selectbox(label="Optimizer",options=["Adam", "SGD", "RMSprop", "Adagrad", "Adadelta"])
-            epochs = st.selectbox(label="Epochs",options=[1,3,5,10, 20, 30, 40, 50, 100, 200])
+            epochs = st.selectbox(label="Max Epochs",options=[1,3,5,10, 20, 30, 40, 50, 100, 200] , index=5)
         with col3  :
             loss_function = st.selectbox(label="Loss Function",options=["mean_squared_error","mean_absolute_error", "huber_loss","mean_absolute_percentage_error"])
-            batch_size = st.selectbox(label="Batch Size",options=[1,16, 32, 64, 128, 256])
+            batch_size = st.selectbox(label="Batch Size",options=[1,16, 32, 64, 128, 256] , index=2)
         
         scaler = st.selectbox(label="Scaler",options=["StandardScaler", "MinMaxScaler", "RobustScaler"])
+        features = st.multiselect(label="Input Features" , options=feature_store.FEATURES , default=feature_store.DEFAULT_FEATURES)
+
+
+    with st.expander("Hyperparameter Search") :
+        st.markdown("Train many configurations in parallel (one worker per CPU core) and rank them by error on a validation slice at the end of the training range; test split errors are shown alongside.")
+
+        method = st.radio(label="Search Method" , options=["Successive Halving" , "Random" , "Grid"] , horizontal=True)
+
+        col1 , col2 = st.columns(2)
+        with col1 :
+            windows = st.multiselect(label="Window Sizes" , options=tuning.SPACE["window"] , default=[20 , 60 , 120])
+            learning_rates = st.multiselect(label="Learning Rates" , options=tuning.SPACE["learning_rate"] , default=[0.01 , 0.001])
+            optimizers = st.multiselect(label="Optimizers" , options=tuning.SPACE["optimize"] , default=["Adam"])
+        with col2 :
+            batches = st.multiselect(label="Batch Sizes" , options=tuning.SPACE["batch"] , default=[32 , 64])
+            activations = st.multiselect(label="Activations" , options=tuning.SPACE["function_activation"] , default=["linear"])
+            scalers = st.multiselect(label="Scalers" , options=tuning.SPACE["scale"] , default=["MinMaxScaler"])
+
+        space = {"window" : windows , "learning_rate" : learning_rates , "optimize" : optimizers ,
+                 "batch" : batches , "function_activation" : activations , "scale" : scalers}
+        space = {name : values for name , values in space.items() if values}
+
+        col1 , col2 = st.columns(2)
+        with col1 :
+            max_epochs = st.selectbox(label="Max Epochs per Trial" , options=[3 , 9 , 27 , 81] , index=1)
+        with col2 :
+            trials = st.slider(label="Random Trials" , min_value=2 , max_value=50 , value=10 , disabled=method != "Random")
+
+        if st.button("Run Search") :
+
+            datasets , _ = feature_store.load_features(stock , data , features=features)
+            split = preprocessing_model.split_num(datasets=datasets , size=int(train_len.replace("%", "")) / 100)
+
+            if split >= len(datasets) :
+                st.error("Choose a train size below 100% so trials can be scored on the test split.")
+            else :
+                configs = tuning.sample(space , trials) if method == "Random" else tuning.grid(space)
+                progress_bar = st.progress(0 , text=f"Evaluating {len(configs)} configurations")
+
+                if method == "Successive Halving" :
+                    board , errors = tuning.successive_halving(datasets , split , configs , max_epochs=max_epochs ,
+                                                               progress=lambda done : progress_bar.progress(min(done , 1.0)))
+                else :
+                    board , errors = tuning.search(datasets , split , configs , epochs=max_epochs ,
+                                                   progress=lambda done : progress_bar.progress(done))
+
+                st.session_state.search = (stock , board , errors)
+
+        if "search" in st.session_state and st.session_state.search[0] == stock :
+
+            _ , board , errors = st.session_state.search
+
+            st.subheader("Leaderboard")
+            data_table.paged_table(board , key='advance_search' , page_size=20)
+            if errors :
+                st.caption(f"{len(errors)} configurations failed: " + "; ".join(sorted(set(errors.values())))[:300])
 
 
     if st.button("Apply Model & Forecast Data") :
 
-        datasets = preprocessing_model.make_datasets(data=data)
+        # before training: Open/High/Low/Volume/ATR have no projected values after the first day
+        try :
+            forecast_engine.check_features(features , forecast)
+        except ValueError as error :
+            st.error(str(error))
+            st.stop()
 
-        scaled_data = preprocessing_model.scale_data(datasets=datasets , scale=scaler)
+        datasets , dates = feature_store.load_features(stock , data , features=features)
+        data = data.loc[dates]
 
         train_len =  preprocessing_model.split_num(datasets=datasets , size=int(train_len.replace("%", "")) / 100) 
 
-        x_train , y_train =  preprocessing_model.preprocessing( scaled_data=scaled_data["scaled_data"] , train_len=train_len , window=window)
+        model , scaled_data = preprocessing_model.fit_or_load(ticker=stock , datasets=datasets , train_len=train_len , window=window , scale=scaler ,
+                                                             batch=batch_size , epoch=epochs , learning_rate=learning_rate , optimize=optimizer ,
+                                                             loss_function=loss_function , function_activation=activation , features=features ,
+                                                             mode=None if fit_mode == "custom" else fit_mode)
 
-        model =  preprocessing_model.modelling(x_train , y_train , batch=batch_size , epoch=epochs , window=window , learning_rate=learning_rate , optimize=optimizer , loss_function=loss_function, function_activation=activation)
+        report = scaled_data.get("report")
+        if report :
+            st.caption(f"Trained {report['epochs']} epochs in {report['seconds']:.1f}s · {report['samples_per_sec']:,.0f} samples/sec")
 
-        prediction =  preprocessing_model.test_data(model=model , datasets=datasets , scaled_data=scaled_data['scaled_data'] , train_len=train_len , scaler=scaled_data['scaler'])
+        prediction =  preprocessing_model.test_data(model=model , datasets=datasets , scaled_data=scaled_data['scaled_data'] , train_len=train_len , scaler=scaled_data['scaler'] , window=window)
 
-        forecast_value =  preprocessing_model.meramal(scaled_data=scaled_data['scaled_data'] , scaler=scaled_data['scaler'] , model=model , days=forecast , window=window)
+        forecast_value =  preprocessing_model.meramal(scaled_data=scaled_data['scaled_data'] , scaler=scaled_data['scaler'] , model=model , days=forecast , window=window , features=features)
 
         business_days = pd.bdate_range(start=end, periods=forecast)
 
@@ -82,8 +155,7 @@ def Forecasting(stock):
         
         with st.expander("Stock Data") : 
                 
-            with st.container(height=400) :
-                st.table(data) 
+            data_table.paged_table(data , key='advance_data')
         
         with st.expander("prediction plot and metrics"):
 
@@ -115,8 +187,7 @@ def Forecasting(stock):
             st.divider()
 
         with st.expander("Prediction Data"):
-            with st.container(height=400) :
-                st.table(test[['Close' , 'prediction']])      
+            data_table.paged_table(test[['Close' , 'prediction']] , key='advance_prediction')
 
 
         with st.expander("Forecasting") :
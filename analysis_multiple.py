@@ -1,11 +1,11 @@
 import streamlit as st
 import pandas as pd
 import helper
-import time
+import data_table
+import progress
 import preprocessing
 import datetime
 import warnings
-from scipy.stats import skew, kurtosis
 
 
 def multiply_alalysis(stock):
@@ -44,35 +44,46 @@ def multiply_alalysis(stock):
 
         st.session_state.load = True
 
-        progress_bar = st.progress(0)
-        for i in range(100):
-            time.sleep(0.050)
-            progress_bar.progress(i + 1)
+        tracker = progress.PipelineProgress(
+            ["fetch", "overview", "performance", "statistics", "ratios"]
+        )
 
+        tracker.start("fetch")
         data = preprocessing.download_multistock_data(
             list(stock), start_date=start, end_date=end
         )
+        errors = data.attrs.get("errors", {})
+        if errors:
+            st.warning(
+                "Skipped : "
+                + ", ".join(f"{ticker} ({reason})" for ticker, reason in errors.items())
+            )
+            stock = [ticker for ticker in stock if ticker not in errors]
+        if not stock:
+            st.error("None of the selected stocks could be loaded.")
+            return
+        panel = preprocessing.build_panel(data)
         with st.expander("Display Stock Data"):
 
-            with st.container(height=400):
-                st.table(data)
+            data_table.paged_table(data, key="multi_data")
             col1, col2 = st.columns([2, 1])
             with col1:
                 st.subheader(f"Total Rows : {data.shape[0]}")
             with col2:
                 st.subheader(f"Total Columns : {data.shape[1]}")
 
+        tracker.start("overview")
         with st.expander("Data Trends Overview"):
 
             st.title("Stock Price")
-            st.plotly_chart(helper.plot_with_dropdown(data=data, tickers=stock))
+            st.plotly_chart(helper.plot_with_dropdown(data=panel, tickers=stock))
 
             st.divider()
             col1, col2, col3 = st.columns(3)
 
             with col1:
                 data_max = (
-                    preprocessing.corr_data(data=data).tail(1).max().reset_index()
+                    preprocessing.corr_data(data=panel).tail(1).max().reset_index()
                 )
                 highest = data_max[data_max[0] == data_max[0].max()]
                 st.subheader("Highest Price : ")
@@ -81,7 +92,7 @@ def multiply_alalysis(stock):
                 )
 
                 data_vol = (
-                    preprocessing.corr_data(data=data, columns="Volume")
+                    preprocessing.corr_data(data=panel, columns="Volume")
                     .tail(1)
                     .max()
                     .reset_index()
@@ -94,7 +105,7 @@ def multiply_alalysis(stock):
 
             with col2:
                 data_min = (
-                    preprocessing.corr_data(data=data).tail(1).min().reset_index()
+                    preprocessing.corr_data(data=panel).tail(1).min().reset_index()
                 )
                 min = data_min[data_min[0] == data_min[0].min()]
                 st.subheader("Lowest Price : ")
@@ -103,7 +114,7 @@ def multiply_alalysis(stock):
                 )
 
                 data_vol = (
-                    preprocessing.corr_data(data=data, columns="Volume")
+                    preprocessing.corr_data(data=panel, columns="Volume")
                     .tail(1)
                     .min()
                     .reset_index()
@@ -117,7 +128,7 @@ def multiply_alalysis(stock):
             with col3:
 
                 mean_vol = (
-                    preprocessing.corr_data(data=data, columns="Volume").mean() / 30
+                    preprocessing.corr_data(data=panel, columns="Volume").mean() / 30
                 ).reset_index()
                 vol_highest = mean_vol[mean_vol[0] == mean_vol[0].min()]
                 st.subheader("Lowest Average Volume(30)")
@@ -126,7 +137,7 @@ def multiply_alalysis(stock):
                 )
 
                 mean_vol = (
-                    preprocessing.corr_data(data=data, columns="Volume").mean() / 30
+                    preprocessing.corr_data(data=panel, columns="Volume").mean() / 30
                 ).reset_index()
                 vol_highest = mean_vol[mean_vol[0] == mean_vol[0].max()]
                 st.subheader("Highest Average Volume(30)")
@@ -138,17 +149,18 @@ def multiply_alalysis(stock):
             candle_stock = st.selectbox("select one :", options=stock)
             st.plotly_chart(
                 helper.candle_plot(
-                    df=data.reset_index(), multi=True, ticker=candle_stock
+                    df=panel, multi=True, ticker=candle_stock
                 )
             )
 
+        tracker.start("performance")
         with st.expander("Performance Metrics"):
 
             perfoma_data = preprocessing.calculate_daily_returns_multi(data=data)
 
             st.title("Daily Returns of Selected Stocks")
             st.plotly_chart(
-                helper.plot_daily_returns_dropdown(data=perfoma_data, tickers=stock)
+                helper.plot_daily_returns_dropdown(data=panel, tickers=stock)
             )
 
             st.title("Cumulative Returns Chart")
@@ -231,7 +243,7 @@ def multiply_alalysis(stock):
                 ma_values.append(ma_value)
 
             data_moving = preprocessing.Rolling(
-                data=data, roll=ma_values, multi=True, stock=stock_ma
+                data=panel, roll=ma_values, multi=True, stock=stock_ma
             )
 
             st.plotly_chart(
@@ -243,19 +255,22 @@ def multiply_alalysis(stock):
             st.title(" Average True Range (ATR)")
 
             stock_atr = st.selectbox(label="selcet stock : ", options=stock)
-            ATR = preprocessing.calculate_atr(data=data, ticker=stock_atr)
+            ATR = preprocessing.calculate_atr(data=panel, ticker=stock_atr)
 
             st.info(f"{ATR.rolling_14.iloc[-1]}")
             st.plotly_chart(
                 helper.Overview_all(data=ATR, title=(f"Rolling ATR {stock_atr}"))
             )
 
+        tracker.start("statistics")
         with st.expander("Statistical Analysis"):
 
             st.title("Descriptive Statistics")
 
+            from scipy.stats import skew, kurtosis
+
             stock_stats = st.selectbox("Select one stock :", options=stock)
-            data_stats = data[data.ticker == stock_stats]
+            data_stats = panel.frame(stock_stats)
 
             col1, col2, col3 = st.columns(3)
 
@@ -287,7 +302,7 @@ def multiply_alalysis(stock):
 
             st.title("Correlation Matrix ")
 
-            corr_data = preprocessing.corr_data(data=data)
+            corr_data = preprocessing.corr_data(data=panel)
             st.plotly_chart(helper.heatmap(corr=corr_data.pct_change().corr()))
 
             col1, col2 = st.columns(2)
@@ -328,6 +343,7 @@ def multiply_alalysis(stock):
                 else:
                     st.error(corr)
 
+        tracker.start("ratios")
         with st.expander("Risk and Return Ratios"):
 
             st.title("Return Ratio")
@@ -337,11 +353,12 @@ def multiply_alalysis(stock):
 
             col1, col2 = st.columns(2)
 
-            data_ratio = data[data.ticker == ratio_stock].drop("ticker", axis=1)
+            data_ratio = panel.frame(ratio_stock)
+            ratios = preprocessing.metrics_summary(data=data_ratio)
 
             with col1:
                 st.subheader("Sharpe Ratio : ")
-                sharpe_ratio = preprocessing.sharpe_ratio(data=data_ratio)
+                sharpe_ratio = ratios.sharpe
                 if sharpe_ratio < 1:
                     st.error(f"{sharpe_ratio:.3f}")
                 elif 1 <= sharpe_ratio < 2:
@@ -350,7 +367,7 @@ def multiply_alalysis(stock):
                     st.success(f"{sharpe_ratio:.3f}")
 
                 st.subheader("Sortino Ratio : ")
-                sortino_ratio = preprocessing.sortino_ratio(data=data_ratio)
+                sortino_ratio = ratios.sortino
 
                 if sortino_ratio < 1:
                     st.error(f"{sortino_ratio:.3f}")
@@ -362,7 +379,7 @@ def multiply_alalysis(stock):
             with col2:
 
                 st.subheader("Calmar Ratio :")
-                Calmar_ratio = preprocessing.calculate_calmar_ratio(data=data_ratio)
+                Calmar_ratio = ratios.calmar
 
                 if Calmar_ratio < 1:
                     st.error(f"{Calmar_ratio:.3f}")
@@ -372,7 +389,7 @@ def multiply_alalysis(stock):
                     None
 
                 st.subheader("Omega Ratio :")
-                Omega_ratio = preprocessing.omega_ratio(data=data_ratio)
+                Omega_ratio = ratios.omega
 
                 if Omega_ratio > 1:
                     st.success(f"{Omega_ratio:.3f}")
@@ -386,6 +403,8 @@ def multiply_alalysis(stock):
             st.title("Expected Return vs Risk ")
             st.plotly_chart(
                 helper.risk_plot(
-                    rets=preprocessing.corr_data(data=data).pct_change().dropna()
+                    rets=preprocessing.corr_data(data=panel).pct_change().dropna()
                 )
             )
+
+        tracker.finish()
@@ -3,7 +3,8 @@ import pandas as pd
 import datetime
 import preprocessing
 import helper
-import time
+import data_table
+import progress
 
 
 def Analysis_stock_data(stock_symbol):
@@ -31,26 +32,31 @@ def Analysis_stock_data(stock_symbol):
 
     if st.button("Retrieve Data and Perform Analysis"):
 
-        progress_bar = st.progress(0)
-        for i in range(100):
-            time.sleep(0.020)
-            progress_bar.progress(i + 1)
-
-        data = preprocessing.Get_Analysis_Data(
-            start=start, end=end, ticker=stock_symbol
+        tracker = progress.PipelineProgress(
+            ["fetch", "overview", "returns", "moving average", "ratios"]
         )
-        data_compare = preprocessing.Get_compare_data(start=start, end=end)
+
+        tracker.start("fetch")
+        try:
+            data, data_compare = preprocessing.Get_analysis_and_compare(
+                start=start, end=end, ticker=stock_symbol
+            )
+        except ValueError as error:
+            st.error(f"Could not load price data : {error}")
+            return
+        if data_compare.empty:
+            st.warning("Benchmark data is unavailable, ratios against it are skipped.")
 
         with st.expander("Display Stock Data"):
 
-            with st.container(height=400):
-                st.table(data)
+            data_table.paged_table(data, key="single_data")
             col1, col2 = st.columns([2, 1])
             with col1:
                 st.subheader(f"Total Rows : {data.shape[0]}")
             with col2:
                 st.subheader(f"Total Columns : {data.shape[1]}")
 
+        tracker.start("overview")
         with st.expander("Comprehensive Data Overview"):
 
             st.title("Graphical Data Representation : ")
@@ -90,6 +96,7 @@ def Analysis_stock_data(stock_symbol):
             st.title("Candlestick Chart")
             st.plotly_chart(helper.candle_plot(df=data.reset_index(), multi=False))
 
+        tracker.start("returns")
         with st.expander("Return"):
 
             st.title("Daily Percentage Return :")
@@ -134,16 +141,17 @@ def Analysis_stock_data(stock_symbol):
                 )
             )
 
-            st.title("Daily Return Comparison: Stock vs. Benchmark")
-            st.plotly_chart(
-                helper.Overview_all(
-                    data=preprocessing.compare_data_merge(
-                        data=data, compare=data_compare
-                    ),
-                    drop=False,
-                    title="Comparison: Stock vs. Benchmark",
+            if not data_compare.empty:
+                st.title("Daily Return Comparison: Stock vs. Benchmark")
+                st.plotly_chart(
+                    helper.Overview_all(
+                        data=preprocessing.compare_data_merge(
+                            data=data, compare=data_compare
+                        ),
+                        drop=False,
+                        title="Comparison: Stock vs. Benchmark",
+                    )
                 )
-            )
 
             st.divider()
 
@@ -165,17 +173,17 @@ def Analysis_stock_data(stock_symbol):
 
             st.divider()
             st.title("Drawdown : ")
-            st.plotly_chart(
-                helper.drawdown_plot(data=preprocessing.data_drawdown(data=data))
-            )
+            drawdown = preprocessing.data_drawdown(data=data)
+            st.plotly_chart(helper.drawdown_plot(data=drawdown))
 
             st.subheader(f"Maximum Drawdown (MDD): ")
-            st.error(f"{preprocessing.data_drawdown(data=data).Drawdown.min():.2%}")
+            st.error(f"{drawdown.Drawdown.min():.2%}")
             st.subheader(f"Maximum Drawdown Duration :")
             st.error(
-                f"{preprocessing.calculate_drawdown_duration(data=preprocessing.data_drawdown(data))} Days"
+                f"{preprocessing.calculate_drawdown_duration(data=drawdown)} Days"
             )
 
+        tracker.start("moving average")
         with st.expander("Moving Average"):
 
             st.title("Rolling Moving Average : ")
@@ -194,10 +202,14 @@ def Analysis_stock_data(stock_symbol):
                 )
             )
 
+        tracker.start("ratios")
         with st.expander("Ratio"):
 
             st.title("Sharpe Ratio :")
-            sharpe_ratio = preprocessing.sharpe_ratio(data=data)
+            ratios = preprocessing.metrics_summary(
+                data=data, benchmark_data=None if data_compare.empty else data_compare
+            )
+            sharpe_ratio = ratios.sharpe
 
             if sharpe_ratio < 1:
                 st.error(f"{sharpe_ratio:.3f}")
@@ -221,7 +233,7 @@ def Analysis_stock_data(stock_symbol):
 
             with col1:
                 st.subheader("Sortino Ratio :")
-                sortino_ratio = preprocessing.sortino_ratio(data=data)
+                sortino_ratio = ratios.sortino
 
                 if sortino_ratio < 1:
                     st.error(f"{sortino_ratio:.3f}")
@@ -231,7 +243,7 @@ def Analysis_stock_data(stock_symbol):
                     None
 
                 st.subheader("Calmar Ratio :")
-                Calmar_ratio = preprocessing.calculate_calmar_ratio(data=data)
+                Calmar_ratio = ratios.calmar
 
                 if Calmar_ratio < 1:
                     st.error(f"{Calmar_ratio:.3f}")
@@ -243,9 +255,7 @@ def Analysis_stock_data(stock_symbol):
             with col2:
 
                 st.subheader("Information Ratio :")
-                information_ratio = preprocessing.calculate_information_ratio(
-                    portfolio_data=data, benchmark_data=data_compare
-                )
+                information_ratio = ratios.information
 
                 if information_ratio > 1:
                     st.success(f"{information_ratio:.3f}")
@@ -255,7 +265,7 @@ def Analysis_stock_data(stock_symbol):
                     None
 
                 st.subheader("Omega Ratio :")
-                Omega_ratio = preprocessing.omega_ratio(data=data)
+                Omega_ratio = ratios.omega
 
                 if Omega_ratio > 1:
                     st.success(f"{Omega_ratio:.3f}")
@@ -266,14 +276,12 @@ def Analysis_stock_data(stock_symbol):
 
             with col3:
 
-                capture_ratio = preprocessing.calculate_capture_ratios(
-                    data, benchmark_data=data_compare
-                )
-
                 st.subheader("Upside Capture Ratio :")
-                st.success(capture_ratio["Upside Capture Ratio"])
+                st.success(ratios.upside_capture)
 
                 st.subheader("Downside Capture Ratio :")
-                st.error(capture_ratio["Downside Capture Ratio"])
+                st.error(ratios.downside_capture)
 
             st.divider()
+
+        tracker.finish()
@@ -0,0 +1,48 @@
+import streamlit as st
+import pandas as pd
+import datetime
+import screener
+
+
+def universe_screening(stock_symbols):
+
+    st.title(":violet[Universe Screener]")
+    st.markdown(
+        """
+                **Screen every listed stock at once.**
+
+                Returns, annualized volatility, Sharpe and Sortino ratios, maximum drawdown and ATR are computed for the whole ticker list in parallel, straight from the local price store. Click any column header to sort.
+                """
+    )
+    st.divider()
+
+    col1, col2 = st.columns(2)
+    with col1:
+        start = st.date_input("Screen Start : ", value=pd.to_datetime("2023-01-01"))
+    with col2:
+        end = st.date_input("Screen End : ", value=pd.to_datetime(datetime.date.today()))
+
+    if st.button("Run Screen"):
+
+        progress_bar = st.progress(0)
+        table, errors = screener.screen_universe(
+            list(stock_symbols),
+            start=start,
+            end=end,
+            progress=lambda done: progress_bar.progress(done),
+        )
+        st.session_state.screen = (table, errors)
+
+    if "screen" in st.session_state:
+
+        table, errors = st.session_state.screen
+
+        st.subheader(f"Screened Stocks : {len(table)}")
+        st.dataframe(table, use_container_width=True, hide_index=True, height=600)
+
+        if errors:
+            with st.expander(f"Skipped Stocks ({len(errors)})"):
+                st.dataframe(
+                    pd.DataFrame({"Ticker": list(errors), "Reason": list(errors.values())}),
+                    hide_index=True,
+                )
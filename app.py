@@ -1,27 +1,43 @@
 import streamlit as st
-import analysis_one
-import analysis_multiple
-import forecasting
-import advance_forecasting
 import pandas as pd
-import guide
+import data_table
+import ticker_index
+import profiling
+
+# page modules are imported inside their sections, so the analysis pages never load TensorFlow
 
 st.set_page_config(layout="wide")
 
-ticker_list = pd.read_csv("Ticker_list.csv")
+# opt-in per-rerun timings of the data, model and chart functions
+profile = st.sidebar.toggle("Profile reruns" , value=profiling.DEFAULT_ON)
+if profile :
+    import preprocessing , preprocessing_model , helper , price_store , fetcher
+    track_memory = st.sidebar.checkbox("Track memory (slower)")
+    profiling.instrument(preprocessing , preprocessing_model , helper , price_store , fetcher)
+    profiling.enable(memory=track_memory)
+    profiling.reset()
+else :
+    profiling.disable()
+
+@st.cache_resource
+def load_ticker_index():
+    return ticker_index.TickerIndex(pd.read_csv("Ticker_list.csv"))
+
+symbols = load_ticker_index()
+ticker_list = symbols.frame
 
 
 st.image("picture.png", caption="My Name Is Benjamin Uka.",use_column_width=True)
 section = st.radio(
     "**Select Section:**", 
-    options=["📊 In-Depth Analysis","🔮 Future Trends Forecast", "⚙️ Customize LSTM Parameters","📈 Stock Symbols"])
+    options=["📊 In-Depth Analysis","🔮 Future Trends Forecast", "⚙️ Customize LSTM Parameters","🔍 Universe Screener","📈 Stock Symbols"])
 st.divider()
 
 ticker= ticker_list['Ticker'].values
 ticker_map = {ticker: ticker + '.JK' for ticker in ticker}
 display_names = list(ticker_map.keys())
 
-selected_display_name = st.selectbox('Pick a Stock for Analysis & Forecast',  options=display_names , index=1) 
+selected_display_name = st.selectbox('Pick a Stock for Analysis & Forecast',  options=display_names , index=1 , format_func=symbols.label) 
 stock_symbol = ticker_map[selected_display_name]
 
 
@@ -29,6 +45,9 @@ stock_symbol = ticker_map[selected_display_name]
 
 if section == "📊 In-Depth Analysis" : 
 
+    import analysis_one
+    import analysis_multiple
+
     tab1, tab2 = st.tabs(["Single Stock Analysis", "Multiple Stock Analysis"])
 
     with tab1 :
@@ -37,7 +56,7 @@ if section == "📊 In-Depth Analysis" :
     
     with tab2 : 
          
-      selected_display_names = st.multiselect('Pick a Stock for Multiple Analysis', options=display_names , max_selections=4 , default=display_names[:2])
+      selected_display_names = st.multiselect('Pick a Stock for Multiple Analysis', options=display_names , max_selections=4 , default=display_names[:2] , format_func=symbols.label)
 
       selected_symbols = [ticker_map[name] for name in selected_display_names]
 
@@ -45,6 +64,9 @@ if section == "📊 In-Depth Analysis" :
 
 elif section == "🔮 Future Trends Forecast":
 
+    import forecasting
+    import guide
+
     tab1 , tab2 = st.tabs(["Forecast" , "Documentation"])
 
     with tab1 : 
@@ -53,24 +75,30 @@ elif section == "🔮 Future Trends Forecast":
         guide.Forecast()
 
 elif section == '⚙️ Customize LSTM Parameters':
+    import advance_forecasting
     advance_forecasting.Forecasting(stock=stock_symbol)
+elif section == '🔍 Universe Screener' :
+    import analysis_universe
+    analysis_universe.universe_screening(list(ticker_map.values()))
 elif section == '📈 Stock Symbols' :
 
     st.title(":red[Indonesia Stock]")
 
-    search = st.text_input("Search : ")
-    if st.button("Search"):
-        if len(ticker_list[ticker_list['Ticker'] == search.upper()]) > 0 : 
-            st.table(ticker_list[ticker_list['Ticker'] == search.upper()])
-        elif len(ticker_list[ticker_list['Company Name'] == search]) > 0 : 
-            st.table(ticker_list[ticker_list['Company Name'] == search])
+    search = st.text_input("Search : ", placeholder="ticker, company name or part of it")
+    if search:
+        result = symbols.lookup(search)
+        if len(result) > 0 : 
+            st.dataframe(result , use_container_width=True , hide_index=True)
         else :
             st.error("stock not available here.")
 
-    st.table(ticker_list)
+    data_table.paged_table(ticker_list , key='symbols')
 else : 
     st.title(":blue[select section]")
 
+if profile :
+    profiling.render_panel()
+
 
 
 
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import windowing
+import preprocessing_model
+import forecast_engine
+from sklearn.metrics import mean_absolute_error , mean_squared_error , mean_absolute_percentage_error , r2_score
+
+
+FOLDS = 5
+FINE_TUNE_EPOCHS = 3
+
+
+def fold_bounds(rows , window=60 , folds=FOLDS , min_train=None) :
+    # expanding window: fold k trains on [0, end_k) and is scored on the next block of equal size
+    min_train = min_train or max(window * 3 , rows // 2)
+    if rows - min_train < folds :
+        raise ValueError("not enough history for the requested number of folds")
+
+    edges = np.linspace(min_train , rows , folds + 1).astype(int)
+    return list(zip(edges[:-1] , edges[1:]))
+
+
+def _scores(truth , predict) :
+    return {"RMSE" : np.sqrt(mean_squared_error(truth , predict)) ,
+            "MAE" : mean_absolute_error(truth , predict) ,
+            "MAPE" : mean_absolute_percentage_error(truth , predict) ,
+            "R2" : r2_score(truth , predict) if len(truth) > 1 else np.nan}
+
+
+def _fit(model , scaled , x_all , train_end , window , batch , epoch , patience , **params) :
+    # training windows are slices of one precomputed view; the tail of the fold is held out for early stopping
+    split = preprocessing_model.validation_split(train_end , window=window)
+    stop = train_end if split is None else split
+
+    x_train , y_train = x_all[:stop - window] , scaled[window:stop , 0]
+    validation , callbacks = None , []
+    if split is not None :
+        validation = (x_all[stop - window:train_end - window] , scaled[stop:train_end , 0])
+        callbacks = preprocessing_model.fit_callbacks(patience)
+
+    if model is None :
+        return preprocessing_model.modelling(x_train , y_train , batch=batch , epoch=epoch , window=window ,
+                                             validation=validation , callbacks=callbacks , **params)
+
+    # warm start: the previous fold's weights only need a few epochs on the extended history
+    model.fit(x_train , y_train , batch_size=batch , epochs=epoch , validation_data=validation , callbacks=callbacks , verbose=0)
+    return model
+
+
+def walk_forward(datasets , folds=FOLDS , window=60 , scale='MinMaxScaler' , batch=64 , epoch=15 , fine_tune_epochs=FINE_TUNE_EPOCHS ,
+                 learning_rate=0.001 , optimize='Adam' , loss_function='mean_squared_error' , function_activation='linear' ,
+                 patience=preprocessing_model.PATIENCE , min_train=None , progress=None) :
+
+    datasets = np.asarray(datasets , dtype=np.float32)
+    bounds = fold_bounds(len(datasets) , window=window , folds=folds , min_train=min_train)
+
+    # the scaler only sees the first training block, later folds never leak into it
+    scaler = preprocessing_model.scale_data(datasets[:bounds[0][0]] , scale=scale)["scaler"]
+    scaled = scaler.transform(datasets).astype(np.float32)
+
+    # window i covers rows [i, i + window) and predicts row i + window
+    x_all = windowing.sliding_windows(scaled[:-1] , window)
+
+    params = dict(learning_rate=learning_rate , optimize=optimize , loss_function=loss_function , function_activation=function_activation)
+    rows , predictions , model = [] , [] , None
+
+    for fold , (train_end , test_end) in enumerate(bounds) :
+        model = _fit(model , scaled , x_all , train_end , window , batch , epoch if model is None else fine_tune_epochs , patience , **params)
+
+        infer = forecast_engine.inference_fn(model)
+        predict = forecast_engine.inverse_target(scaler , infer(x_all[train_end - window:test_end - window]))
+        truth = datasets[train_end:test_end , 0].astype(np.float64)
+        naive = datasets[train_end - 1:test_end - 1 , 0].astype(np.float64)
+
+        rows.append(dict(fold=fold + 1 , train_rows=train_end , test_rows=test_end - train_end , **_scores(truth , predict) ,
+                         naive_RMSE=np.sqrt(mean_squared_error(truth , naive))))
+        predictions.append(pd.DataFrame({"row" : np.arange(train_end , test_end) , "fold" : fold + 1 , "actual" : truth , "prediction" : predict}))
+
+        if progress is not None :
+            progress((fold + 1) / len(bounds))
+
+    per_fold = pd.DataFrame(rows)
+    predictions = pd.concat(predictions , ignore_index=True)
+
+    # pooled over every out-of-sample prediction, next to the plain mean of the folds
+    overall = dict(_scores(predictions.actual , predictions.prediction) ,
+                   naive_RMSE=np.sqrt(mean_squared_error(predictions.actual , datasets[predictions.row - 1 , 0])))
+    aggregate = pd.DataFrame([dict(summary="pooled" , **overall) ,
+                              dict(summary="mean of folds" , **per_fold[list(overall)].mean())]).set_index("summary")
+
+    return per_fold , aggregate , predictions
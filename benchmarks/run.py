@@ -0,0 +1,178 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0 , ROOT)
+
+import cache
+import panel
+import helper
+import windowing
+import preprocessing
+import preprocessing_model
+import lite_inference
+import synthetic
+
+
+RESULTS_DIR = os.path.join(ROOT , "benchmarks" , "results")
+REGRESSION = 1.25
+
+
+def random_lstm(n_features=1 , seed=0) :
+    # the app's 128 -> 64 -> 25 -> 1 stack with random weights, no TensorFlow needed
+    rng = np.random.default_rng(seed)
+    shapes = [[(n_features , 512) , (128 , 512) , (512 ,)] , [(128 , 256) , (64 , 256) , (256 ,)] , [(64 , 25) , (25 ,)] , [(25 , 1) , (1 ,)]]
+    arrays = {f"{i}_{j}" : (rng.standard_normal(shape) * 0.1).astype(np.float32) for i , layer in enumerate(shapes) for j , shape in enumerate(layer)}
+    layers = [{"kind" : "lstm" , "return_sequences" : True} , {"kind" : "lstm" , "return_sequences" : False} ,
+              {"kind" : "dense" , "activation" : "linear"} , {"kind" : "dense" , "activation" : "linear"}]
+
+    return lite_inference.LiteModel(layers , arrays)
+
+def keras_lstm(n_features=1 , window=60) :
+    from keras.models import Sequential
+    from keras.layers import Input , Dense , LSTM
+
+    model = Sequential([Input((window , n_features)) , LSTM(128 , return_sequences=True) , LSTM(64) , Dense(25) , Dense(1)])
+    return model
+
+
+def cases(rows , tickers , keras=False) :
+    # name -> zero-argument callable; inputs are built once, outside the timed region
+    single = synthetic.ohlcv(rows=rows)
+    multi = synthetic.multi_ohlcv(tickers=tickers , rows=rows)
+    first = multi.ticker.iloc[0]
+    multi_panel = panel.Panel.from_long(multi)
+
+    datasets = preprocessing_model.make_datasets(single)
+    train_len = preprocessing_model.split_num(datasets)
+    scaled = preprocessing_model.scale_data(datasets)
+    model = random_lstm()
+
+    drawdown = preprocessing.data_drawdown(single)
+    returns = preprocessing.calculate_daily_returns_multi(multi)
+    test = single[train_len:].assign(prediction=single.Close[train_len:].values)
+
+    found = {
+        "preprocessing_model.train_data" : lambda : windowing.materialize(preprocessing_model.train_data(scaled["scaled_data"] , train_len , 60)[0]) ,
+        "preprocessing_model.test_data" : lambda : preprocessing_model.test_data(model , scaled["scaled_data"] , train_len , datasets , scaled["scaler"]) ,
+        "preprocessing_model.meramal[30d]" : lambda : preprocessing_model.meramal(scaled["scaled_data"] , model , scaled["scaler"] , 30) ,
+        "preprocessing.calculate_drawdown_duration" : lambda : preprocessing.calculate_drawdown_duration(single) ,
+        "preprocessing.Rolling" : lambda : preprocessing.Rolling(single) ,
+        "preprocessing.Rolling[multi]" : lambda : preprocessing.Rolling(multi , stock=first , multi=True) ,
+        "preprocessing.calculate_atr" : lambda : preprocessing.calculate_atr(multi , first) ,
+        "preprocessing.corr_data" : lambda : preprocessing.corr_data(multi) ,
+        # the app builds the panel once per download; these time the calls on it, build excluded
+        "panel.Panel.from_long" : lambda : panel.Panel.from_long(multi) ,
+        "preprocessing.Rolling[multi,panel]" : lambda : preprocessing.Rolling(multi_panel , stock=first , multi=True) ,
+        "preprocessing.calculate_atr[panel]" : lambda : preprocessing.calculate_atr(multi_panel , first) ,
+        "preprocessing.corr_data[panel]" : lambda : preprocessing.corr_data(multi_panel) ,
+        "preprocessing.metrics_summary" : lambda : preprocessing.metrics_summary(single) ,
+        "helper.line_plot" : lambda : helper.line_plot(single , column="Close" , color="blue") ,
+        "helper.Overview_all" : lambda : helper.Overview_all(single , title="Overview" , drop=True) ,
+        "helper.candle_plot" : lambda : helper.candle_plot(single.reset_index()) ,
+        "helper.drawdown_plot" : lambda : helper.drawdown_plot(drawdown) ,
+        "helper.plot_with_dropdown" : lambda : helper.plot_with_dropdown(multi , tickers=list(multi.ticker.unique())) ,
+        "helper.plot_with_dropdown[panel]" : lambda : helper.plot_with_dropdown(multi_panel , tickers=multi_panel.tickers) ,
+        "helper.plot_multi_line" : lambda : helper.plot_multi_line(returns , hue="ticker" , y="Cumulative Return") ,
+        "helper.predictions_plot" : lambda : helper.predictions_plot(single[:train_len] , test) ,
+    }
+
+    if keras :
+        keras_model = keras_lstm()
+        found["preprocessing_model.meramal[30d,keras]"] = lambda : preprocessing_model.meramal(scaled["scaled_data"] , keras_model , scaled["scaler"] , 30)
+
+    return found
+
+
+def measure(func , repeat=5 , warmup=1) :
+    # memoized functions would only measure a cache hit, so the cache is cleared before every call
+    for _ in range(warmup) :
+        cache.clear()
+        func()
+
+    times = []
+    for _ in range(repeat) :
+        cache.clear()
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+
+    return {"min" : min(times) , "median" : float(np.median(times)) , "mean" : float(np.mean(times)) , "repeat" : repeat}
+
+
+def environment() :
+    try :
+        commit = subprocess.run(["git" , "rev-parse" , "--short" , "HEAD"] , capture_output=True , text=True , cwd=ROOT).stdout.strip()
+    except OSError :
+        commit = ""
+
+    return {"commit" : commit , "python" : platform.python_version() , "numpy" : np.__version__ , "pandas" : pd.__version__ ,
+            "machine" : platform.machine() , "processor" : platform.processor() , "cpus" : os.cpu_count() ,
+            "timestamp" : time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def compare(old , new , threshold=REGRESSION) :
+    # median ratio per benchmark; above threshold is reported as a regression
+    rows , regressions = [] , []
+    for name , result in new["results"].items() :
+        if name not in old["results"] :
+            continue
+        before , after = old["results"][name]["median"] , result["median"]
+        ratio = after / before if before else float("inf")
+        rows.append((name , before * 1000 , after * 1000 , ratio))
+        if ratio > threshold :
+            regressions.append(name)
+
+    print(f"{'benchmark':<44} {'before ms':>10} {'after ms':>10} {'ratio':>7}")
+    for name , before , after , ratio in rows :
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<44} {before:10.2f} {after:10.2f} {ratio:7.2f}{flag}")
+
+    return regressions
+
+
+def main(argv=None) :
+    parser = argparse.ArgumentParser(description="Time the hot paths on synthetic OHLCV data, offline and on CPU.")
+    parser.add_argument("--rows" , type=int , default=2500 , help="bars per ticker (2500 is about 10 years)")
+    parser.add_argument("--tickers" , type=int , default=4)
+    parser.add_argument("--repeat" , type=int , default=5)
+    parser.add_argument("--filter" , default="" , help="only run benchmarks whose name contains this")
+    parser.add_argument("--keras" , action="store_true" , help="also time meramal through a Keras model (imports TensorFlow)")
+    parser.add_argument("--out" , default=None , help="result file, default benchmarks/results/<commit>.json")
+    parser.add_argument("--compare" , default=None , help="earlier result file to compare against")
+    parser.add_argument("--threshold" , type=float , default=REGRESSION)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name , func in cases(args.rows , args.tickers , keras=args.keras).items() :
+        if args.filter in name :
+            results[name] = measure(func , repeat=args.repeat)
+            print(f"{name:<44} {results[name]['median'] * 1000:10.2f} ms")
+
+    run = {"environment" : environment() , "config" : {"rows" : args.rows , "tickers" : args.tickers , "repeat" : args.repeat} , "results" : results}
+
+    out = args.out or os.path.join(RESULTS_DIR , f"{run['environment']['commit'] or 'run'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)) , exist_ok=True)
+    with open(out , "w") as f :
+        json.dump(run , f , indent=2)
+    print(f"results written to {out}")
+
+    if args.compare :
+        with open(args.compare) as f :
+            old = json.load(f)
+        if old.get("config") != run["config"] :
+            print(f"note: configs differ ({old.get('config')} vs {run['config']})")
+        return 1 if compare(old , run , threshold=args.threshold) else 0
+
+    return 0
+
+
+if __name__ == "__main__" :
+    sys.exit(main())
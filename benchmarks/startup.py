@@ -0,0 +1,66 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# what a fresh Streamlit worker imports to render each section
+PATHS = {
+    "analysis" : ["streamlit" , "pandas" , "data_table" , "ticker_index" , "analysis_one" , "analysis_multiple" , "preprocessing" , "helper"] ,
+    "forecast" : ["streamlit" , "pandas" , "data_table" , "ticker_index" , "forecasting" , "advance_forecasting" , "guide"] ,
+}
+# modules a path must not pull in at import time
+FORBIDDEN = {
+    "analysis" : ["tensorflow" , "keras" , "scipy.stats" , "sklearn"] ,
+    "forecast" : ["tensorflow" , "keras"] ,
+}
+BUDGET = 3.0
+
+PROBE = """
+import sys, json, time
+sys.path.insert(0 , {root!r})
+started = time.perf_counter()
+for name in {modules!r} :
+    __import__(name)
+print(json.dumps({{"seconds" : time.perf_counter() - started , "modules" : sorted(sys.modules)}}))
+"""
+
+
+def measure(modules , repeat=3) :
+    # a fresh interpreter per run, the best of repeat runs filters out disk cache noise
+    runs = []
+    for _ in range(repeat) :
+        output = subprocess.run([sys.executable , "-c" , PROBE.format(root=ROOT , modules=modules)] ,
+                                capture_output=True , text=True , check=True , cwd=ROOT).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    return min(runs , key=lambda run : run["seconds"])
+
+
+def main(argv=None) :
+    parser = argparse.ArgumentParser(description="Import time of each app section in a fresh interpreter.")
+    parser.add_argument("--budget" , type=float , default=BUDGET , help="seconds allowed for the analysis path")
+    parser.add_argument("--repeat" , type=int , default=3)
+    args = parser.parse_args(argv)
+
+    failures = []
+    for path , modules in PATHS.items() :
+        run = measure(modules , repeat=args.repeat)
+        loaded = [name for name in FORBIDDEN[path] if name in run["modules"]]
+        print(f"{path:<10} {run['seconds']:6.2f}s  heavy modules loaded: {', '.join(loaded) or 'none'}")
+
+        if loaded :
+            failures.append(f"{path} path imports {', '.join(loaded)}")
+        if path == "analysis" and run["seconds"] > args.budget :
+            failures.append(f"analysis path took {run['seconds']:.2f}s, budget is {args.budget:.2f}s")
+
+    for failure in failures :
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__" :
+    sys.exit(main())
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+
+def ohlcv(rows=2500 , seed=0 , start="2010-01-01" , price=1000.0 , volatility=0.02) :
+    # geometric random walk on business days, shaped like price_store.load_prices output
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start=start , periods=rows , name="Date")
+
+    close = price * np.exp(np.cumsum(rng.normal(0.0002 , volatility , rows)))
+    open_ = np.concatenate(([price] , close[:-1])) * np.exp(rng.normal(0 , volatility / 4 , rows))
+    spread = np.abs(rng.normal(0 , volatility / 2 , rows))
+    high = np.maximum(open_ , close) * (1 + spread)
+    low = np.minimum(open_ , close) * (1 - spread)
+    volume = rng.lognormal(15 , 0.5 , rows).round()
+
+    return pd.DataFrame({"Close" : close , "High" : high , "Low" : low , "Open" : open_ , "Volume" : volume} , index=dates)
+
+
+def multi_ohlcv(tickers=4 , rows=2500 , seed=0 , start="2010-01-01") :
+    # long format with a ticker column, as preprocessing.download_multistock_data returns it
+    frames = []
+    for i in range(tickers) :
+        frame = ohlcv(rows=rows , seed=seed + i , start=start , price=500.0 * (i + 1))
+        frame["ticker"] = f"SYN{i}.JK"
+        frames.append(frame)
+
+    return pd.concat(frames)
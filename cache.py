@@ -0,0 +1,129 @@
+import sys
+import copy
+import hashlib
+import inspect
+import functools
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+
+MAX_ENTRIES = 512
+MAX_BYTES = 256 * 1024 * 1024
+
+
+def fingerprint(value) :
+    if isinstance(value , (pd.DataFrame , pd.Series)) :
+        digest = hashlib.blake2b(pd.util.hash_pandas_object(value , index=True).values.tobytes() , digest_size=16)
+        labels = list(value.columns) if isinstance(value , pd.DataFrame) else [value.name]
+        digest.update(repr((labels , value.shape)).encode())
+        return digest.hexdigest()
+
+    if isinstance(value , np.ndarray) :
+        digest = hashlib.blake2b(np.ascontiguousarray(value).tobytes() , digest_size=16)
+        digest.update(repr((value.shape , value.dtype.str)).encode())
+        return digest.hexdigest()
+
+    if isinstance(value , (list , tuple)) :
+        return tuple(fingerprint(v) for v in value)
+
+    if isinstance(value , dict) :
+        return tuple(sorted((k , fingerprint(v)) for k , v in value.items()))
+
+    # objects that hash their own contents once, e.g. panel.Panel
+    if callable(getattr(value , "cache_key" , None)) :
+        return value.cache_key()
+
+    return repr(value)
+
+
+def _nbytes(value) :
+    if isinstance(value , (pd.DataFrame , pd.Series)) :
+        return int(value.memory_usage(index=True , deep=False).sum()) if isinstance(value , pd.DataFrame) else int(value.memory_usage(index=True))
+    if isinstance(value , np.ndarray) :
+        return value.nbytes
+    return sys.getsizeof(value)
+
+def _copy(value) :
+    if isinstance(value , (pd.DataFrame , pd.Series , np.ndarray)) :
+        return value.copy()
+    return copy.deepcopy(value)
+
+
+class LRUCache :
+
+    def __init__(self , max_entries=MAX_ENTRIES , max_bytes=MAX_BYTES) :
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self , key) :
+        with self.lock :
+            if key not in self.entries :
+                self.misses += 1
+                return False , None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True , self.entries[key][0]
+
+    def put(self , key , value) :
+        nbytes = _nbytes(value)
+        if nbytes > self.max_bytes :
+            return
+
+        with self.lock :
+            if key in self.entries :
+                self.size -= self.entries.pop(key)[1]
+
+            self.entries[key] = (value , nbytes)
+            self.size += nbytes
+
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes :
+                _ , (_ , dropped) = self.entries.popitem(last=False)
+                self.size -= dropped
+
+    def clear(self) :
+        with self.lock :
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self) :
+        return {"entries" : len(self.entries) , "bytes" : self.size , "hits" : self.hits , "misses" : self.misses}
+
+
+# module level so it survives Streamlit reruns and is shared between sessions
+_cache = LRUCache()
+
+def clear() :
+    _cache.clear()
+
+def stats() :
+    return _cache.stats()
+
+
+def memoize(func) :
+    signature = inspect.signature(func)
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args , **kwargs) :
+        bound = signature.bind(*args , **kwargs)
+        bound.apply_defaults()
+        key = (name ,) + tuple((k , fingerprint(v)) for k , v in bound.arguments.items())
+
+        hit , value = _cache.get(key)
+        if not hit :
+            # the function gets its own copies, so callers never see in-place columns
+            arguments = {k : _copy(v) if isinstance(v , (pd.DataFrame , pd.Series)) else v for k , v in bound.arguments.items()}
+            value = func(**arguments)
+            _cache.put(key , value)
+
+        return _copy(value)
+
+    return wrapper
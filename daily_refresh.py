@@ -0,0 +1,50 @@
+import os
+import argparse
+import pandas as pd
+import price_store
+import preprocessing_model
+
+
+def refresh_ticker(ticker , start , end , days=5 , mode="quick") :
+    # price store and model registry both only do work for the bars added since the last run
+    data = price_store.load_prices(ticker , start=start , end=end)
+    datasets = preprocessing_model.make_datasets(data=data)
+    train_len = preprocessing_model.split_num(datasets=datasets)
+
+    model , scaled_data = preprocessing_model.fit_or_load(ticker=ticker , datasets=datasets , train_len=train_len , mode=mode)
+    forecast = preprocessing_model.meramal(scaled_data=scaled_data['scaled_data'] , scaler=scaled_data['scaler'] , model=model , days=days)
+
+    return forecast , scaled_data.get("report") or {}
+
+
+def refresh(tickers , start , end , days=5 , mode="quick" , progress=None) :
+    forecasts , reports , errors = {} , {} , {}
+
+    for done , ticker in enumerate(tickers , start=1) :
+        try :
+            forecasts[ticker] , reports[ticker] = refresh_ticker(ticker , start , end , days=days , mode=mode)
+        except Exception as error :
+            errors[ticker] = str(error)
+
+        if progress is not None :
+            progress(done / len(tickers))
+
+    table = pd.DataFrame(forecasts , index=pd.bdate_range(start=end , periods=days , name="Date"))
+    return table , pd.DataFrame(reports).T , errors
+
+
+if __name__ == "__main__" :
+    parser = argparse.ArgumentParser(description="Refresh every ticker's LSTM forecast with the latest bars.")
+    parser.add_argument("--start" , default="2015-01-01")
+    parser.add_argument("--end" , default=str(pd.Timestamp.today().date()))
+    parser.add_argument("--days" , type=int , default=5)
+    parser.add_argument("--mode" , default="quick" , choices=list(preprocessing_model.FIT_MODES))
+    parser.add_argument("--out" , default="forecasts.csv")
+    args = parser.parse_args()
+
+    symbols = [f"{t}.JK" for t in pd.read_csv(os.path.join(os.path.dirname(os.path.abspath(__file__)) , "Ticker_list.csv"))["Ticker"]]
+    table , reports , errors = refresh(symbols , start=args.start , end=args.end , days=args.days , mode=args.mode)
+
+    table.to_csv(args.out)
+    updated = int(reports.get("incremental" , pd.Series(dtype=bool)).fillna(False).sum()) if not reports.empty else 0
+    print(f"{len(table.columns)} forecasts written to {args.out} ({updated} incremental updates, {len(errors)} failed)")
@@ -0,0 +1,24 @@
+import math
+import streamlit as st
+
+
+PAGE_SIZE = 50
+
+
+# a fragment, so turning a page reruns only the table, also inside st.button branches
+@st.fragment
+def paged_table(data , key , page_size=PAGE_SIZE) :
+    # only the current page is sliced out and sent, whatever the frame length
+    pages = max(1 , math.ceil(len(data) / page_size))
+
+    col1 , col2 = st.columns([1, 3])
+    with col1 :
+        page = st.number_input("Page" , min_value=1 , max_value=pages , value=1 , step=1 , key=f"{key}_page")
+
+    start = (page - 1) * page_size
+    stop = min(start + page_size , len(data))
+
+    with col2 :
+        st.caption(f"Rows {start + 1 if len(data) else 0} - {stop} of {len(data)} · page {page} of {pages}")
+
+    st.dataframe(data.iloc[start:stop] , use_container_width=True)
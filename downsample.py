@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+
+MAX_POINTS = 2000
+# series up to SLACK times the budget are sent as they are, thinning them saves less than it costs
+SLACK = 2
+
+
+def minmax_indices(y , max_points=MAX_POINTS) :
+    # first, last, and the lowest and highest point of each of max_points // 2 equal buckets, keeps every spike
+    y = np.asarray(y , dtype=np.float64)
+    if len(y) <= max_points * SLACK or max_points < 4 :
+        return np.arange(len(y))
+
+    finite = np.flatnonzero(np.isfinite(y))
+    if len(finite) <= max_points * SLACK :
+        return finite
+
+    y = y[finite]
+    n = len(y)
+    starts = np.unique(np.arange(n) * ((max_points - 2) // 2) // n , return_index=True)[1]
+    counts = np.diff(np.append(starts , n))
+    position = np.arange(n)
+
+    # first position of each bucket's min and max, all buckets in one reduceat each
+    lows = y == np.repeat(np.minimum.reduceat(y , starts) , counts)
+    highs = y == np.repeat(np.maximum.reduceat(y , starts) , counts)
+    first_low = np.minimum.reduceat(np.where(lows , position , n) , starts)
+    first_high = np.minimum.reduceat(np.where(highs , position , n) , starts)
+
+    selected = np.unique(np.concatenate(([0 , n - 1] , first_low , first_high)))
+    return finite[selected]
+
+def minmax(x , y , max_points=MAX_POINTS) :
+    idx = minmax_indices(y , max_points)
+    return np.asarray(x)[idx] , np.asarray(y)[idx]
+
+
+def downsample_groups(data , group , y , max_points=MAX_POINTS) :
+    # long frame with one line per group, each group thinned on its own
+    parts = []
+    for _ , part in data.groupby(group , sort=False) :
+        parts.append(part.iloc[minmax_indices(part[y].values , max_points)])
+
+    return pd.concat(parts) if parts else data
+
+
+def ohlc_buckets(data , max_points=MAX_POINTS , date='Date') :
+    # candles merged into max_points buckets: first open, max high, min low, last close
+    n = len(data)
+    if n <= max_points * SLACK :
+        return data
+
+    starts = np.unique(np.arange(n) * max_points // n , return_index=True)[1]
+    ends = np.append(starts[1:] , n) - 1
+
+    buckets = {
+        date : data[date].values[starts] ,
+        'Open' : data['Open'].values[starts] ,
+        'High' : np.fmax.reduceat(data['High'].values , starts) ,
+        'Low' : np.fmin.reduceat(data['Low'].values , starts) ,
+        'Close' : data['Close'].values[ends] ,
+    }
+    if 'Volume' in data :
+        buckets['Volume'] = np.add.reduceat(np.nan_to_num(data['Volume'].values.astype(np.float64)) , starts)
+
+    return pd.DataFrame(buckets)
@@ -0,0 +1,73 @@
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+import cache
+import preprocessing
+
+
+FEATURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "features")
+
+# Close is always first, it is the column the model predicts
+FEATURES = ['Close', 'Open', 'High', 'Low', 'Volume', 'return',
+            'ma_7', 'ma_30', 'ma_90', 'volatility_7', 'volatility_30', 'atr_14', 'atr_30']
+DEFAULT_FEATURES = ['Close']
+
+
+def feature_frame(data , features=DEFAULT_FEATURES) :
+    features = ['Close'] + [f for f in features if f != 'Close']
+    frame = pd.DataFrame(index=data.index)
+
+    rolling = [int(f.split('_')[1]) for f in features if f.startswith('ma_')]
+    if rolling :
+        means = preprocessing.Rolling(data=data , roll=rolling)
+    if any(f.startswith('volatility_') for f in features) :
+        volatility = preprocessing.Rolling_volatility(data=data)
+    if any(f.startswith('atr_') for f in features) :
+        atr = preprocessing.calculate_atr(data=data)
+
+    for feature in features :
+        if feature in ('Close' , 'Open' , 'High' , 'Low' , 'Volume') :
+            frame[feature] = data[feature]
+        elif feature == 'return' :
+            frame[feature] = data['Close'].pct_change()
+        elif feature.startswith('ma_') :
+            frame[feature] = means[int(feature.split('_')[1])]
+        elif feature.startswith('volatility_') :
+            frame[feature] = volatility[f"rolling_{feature.split('_')[1]}"]
+        elif feature.startswith('atr_') :
+            frame[feature] = atr[f"rolling_{feature.split('_')[1]}"]
+        else :
+            raise ValueError(f"unknown feature: {feature}")
+
+    # indicator warm-up rows have no value yet
+    return frame.dropna()
+
+def build_features(data , features=DEFAULT_FEATURES) :
+    # float32 and C-contiguous: half the memory of the float64 path and ready for the windowing views
+    frame = feature_frame(data , features)
+    return np.ascontiguousarray(frame.values , dtype=np.float32) , frame.index
+
+
+def _path(ticker , features , root) :
+    digest = hashlib.blake2b(repr(list(features)).encode() , digest_size=8).hexdigest()
+    return os.path.join(root , f"{ticker.replace(os.sep , '_')}-{digest}.npz")
+
+def load_features(ticker , data , features=DEFAULT_FEATURES , root=FEATURE_DIR) :
+    # one file per ticker and feature set, rebuilt when the underlying prices change
+    path = _path(ticker , features , root)
+    fingerprint = cache.fingerprint(data)
+
+    if os.path.exists(path) :
+        with np.load(path) as stored :
+            if str(stored['fingerprint']) == fingerprint :
+                return stored['values'] , pd.DatetimeIndex(stored['dates'] , name=data.index.name)
+
+    values , dates = build_features(data , features)
+
+    os.makedirs(root , exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp , values=values , dates=dates.values , fingerprint=np.array(fingerprint))
+    os.replace(tmp , path)
+
+    return values , dates
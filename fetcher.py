@@ -0,0 +1,144 @@
+import time
+import random
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import price_store
+import profiling
+
+
+WORKERS = 8
+RATE = 2.0
+BURST = 4
+RETRIES = 3
+BACKOFF = 0.5
+MAX_BACKOFF = 8.0
+# symbols per multi-ticker download, each download takes one rate limit token
+BATCH_SIZE = 100
+
+
+class FetchError(Exception) :
+    pass
+
+
+class RateLimiter :
+    # token bucket: `rate` requests per second on average, up to `burst` at once
+
+    def __init__(self , rate=RATE , burst=BURST) :
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) :
+        while True :
+            with self.lock :
+                now = time.monotonic()
+                self.tokens = min(self.burst , self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1 :
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def limiter(host , rate=RATE , burst=BURST) :
+    # one bucket per host, shared by every scheduler in the process
+    with _limiters_lock :
+        if host not in _limiters :
+            _limiters[host] = RateLimiter(rate=rate , burst=burst)
+        return _limiters[host]
+
+
+def resilient(fetcher , host="yahoo" , retries=RETRIES , backoff=BACKOFF , max_backoff=MAX_BACKOFF , sleep=time.sleep) :
+    # wraps a price_store fetcher(ticker, start, end) with the host's rate limit and jittered exponential backoff
+    bucket = limiter(host)
+
+    def fetch(ticker , start , end) :
+        for attempt in range(retries + 1) :
+            bucket.acquire()
+            try :
+                data = fetcher(ticker , start , end)
+            except Exception as error :
+                if attempt == retries :
+                    raise FetchError(f"{error} (after {retries + 1} attempts)") from error
+            else :
+                # an empty answer over a longer range is retried, but the last one is returned:
+                # load_prices knows whether the ticker simply was not listed yet
+                if price_store.answered(data , pd.Timestamp(start) , pd.Timestamp(end)) or attempt == retries :
+                    return data
+            sleep(min(max_backoff , backoff * 2 ** attempt) * random.uniform(0.5 , 1.0))
+
+    return fetch
+
+
+def prefetch(tickers , start , end , batch_fetcher , batch_size=BATCH_SIZE , host="yahoo") :
+    # tickers that are missing the same span (e.g. the daily one-bar top-up) share multi-ticker downloads;
+    # returns {(ticker, start, end): frame} for load_prices to pick up, failures are left to the per-ticker path
+    start , end = price_store._day(start) , price_store._day(end)
+    groups = {}
+    for ticker in tickers :
+        coverage = price_store.read_coverage(ticker)
+        for lo , hi in price_store.missing_ranges(coverage , start , end) :
+            groups.setdefault(price_store.fetch_range(coverage , lo , hi) , []).append(ticker)
+
+    bucket , served = limiter(host) , {}
+    for (lo , hi) , members in groups.items() :
+        for i in range(0 , len(members) , batch_size) :
+            bucket.acquire()
+            try :
+                frames = batch_fetcher(members[i:i + batch_size] , lo , hi)
+            except Exception :
+                continue
+            served.update({(ticker , lo , hi) : frame for ticker , frame in frames.items() if not frame.empty})
+
+    return served
+
+def serving(prefetched , fetcher) :
+    # answers from the batch downloads first, anything else goes to the single-ticker fetcher
+    def fetch(ticker , start , end) :
+        frame = prefetched.pop((ticker , price_store._day(start) , price_store._day(end)) , None)
+        return fetcher(ticker , start , end) if frame is None else frame
+
+    return fetch
+
+
+def fetch_many(tickers , start , end , workers=WORKERS , fetcher=None , progress=None) :
+    # bounded thread pool over price_store.load_prices; returns what succeeded plus a reason for each failure
+    tickers = list(dict.fromkeys(tickers))
+    frames , errors = {} , {}
+
+    if not tickers :
+        return frames , errors
+
+    batch_fetcher = None if fetcher is not None else price_store.get_batch_fetcher()
+    prefetched = prefetch(tickers , start , end , batch_fetcher) if batch_fetcher is not None and len(tickers) > 1 else {}
+    fetch = serving(prefetched , resilient(fetcher or price_store.get_fetcher()))
+
+    # pool threads record into the caller's profile, so downloads show up under load_prices
+    with ThreadPoolExecutor(max_workers=max(1 , min(workers , len(tickers))) , initializer=profiling.carry()) as pool :
+        futures = {pool.submit(price_store.load_prices , ticker , start , end , fetcher=fetch) : ticker for ticker in tickers}
+
+        for done , future in enumerate(as_completed(futures) , start=1) :
+            ticker = futures[future]
+            try :
+                data = future.result()
+                if data.empty :
+                    errors[ticker] = "no price data in range"
+                else :
+                    frames[ticker] = data
+            except Exception as error :
+                errors[ticker] = str(error)
+
+            if progress is not None :
+                progress(done / len(futures))
+
+    # keep the caller's order
+    return {t : frames[t] for t in tickers if t in frames} , errors
@@ -0,0 +1,127 @@
+import weakref
+import numpy as np
+import lite_inference
+
+
+_compiled = weakref.WeakKeyDictionary()
+
+
+def inference_fn(model) :
+    # traced once per model; skips predict()'s per-call adapter and callback setup
+    if isinstance(model , lite_inference.LiteModel) :
+        return model
+
+    fn = _compiled.get(model)
+
+    if fn is None :
+        import tensorflow as tf
+        # the traced function only holds a weak reference, otherwise the cache entry would keep the model alive
+        ref = weakref.ref(model)
+        fn = tf.function(lambda x : ref()(x , training=False) , reduce_retracing=True)
+        _compiled[model] = fn
+
+    return lambda x : np.asarray(fn(x))
+
+
+def rollout(model , windows , days , target=0 , noise=None , seed=None , extra=None , next_rows=None) :
+    # windows: (batch, window, features) seeds, one per ticker or scenario path
+    # extra: static second input per row (e.g. ticker ids for the pooled model)
+    # next_rows: predicted target (batch,) -> next scaled feature rows (batch, features), see feature_step
+    windows = np.asarray(windows , dtype=np.float32)
+    if windows.ndim == 2 :
+        windows = windows[... , None]
+
+    batch , window , features = windows.shape
+    rng = np.random.default_rng(seed)
+    infer = inference_fn(model)
+
+    # preallocated rolling buffer, step t reads rows [t, t + window) without any concatenation
+    buffer = np.empty((batch , window + days , features) , dtype=np.float32)
+    buffer[: , :window] = windows
+
+    for t in range(days) :
+        inputs = buffer[: , t:t + window]
+        predict = infer(inputs if extra is None else [inputs , extra]).reshape(batch)
+        if noise :
+            predict = predict + rng.normal(0 , noise , size=batch)
+
+        if next_rows is not None :
+            buffer[: , window + t] = next_rows(predict)
+        else :
+            # a single-feature model has nothing else to carry
+            buffer[: , window + t] = buffer[: , window + t - 1]
+        buffer[: , window + t , target] = predict
+
+    return buffer[: , window: , target]
+
+
+def derivable(feature) :
+    # features that are a function of the Close path alone
+    return feature in ('Close' , 'return') or feature.startswith(('ma_' , 'volatility_'))
+
+def check_features(features , days) :
+    fixed = [f for f in features or [] if not derivable(f)]
+    if days > 1 and fixed :
+        raise ValueError(f"{', '.join(fixed)} cannot be projected past the first day, forecast 1 day or train without them")
+
+def _feature(closes , feature) :
+    if feature == 'Close' :
+        return closes[: , -1]
+    if feature == 'return' :
+        return closes[: , -1] / closes[: , -2] - 1
+    n = int(feature.split('_')[1])
+    if feature.startswith('ma_') :
+        return closes[: , -n:].mean(axis=1)
+    # same as preprocessing.Rolling_volatility: sample std of the last n daily returns
+    window = closes[: , -n - 1:]
+    return (window[: , 1:] / window[: , :-1] - 1).std(axis=1 , ddof=1)
+
+def feature_step(features , scaler , scaled_history , batch=1 , target=0) :
+    # recomputes every Close-derived feature from the predicted path, so each rolled-out row is consistent
+    features = ['Close'] + [f for f in features or [] if f != 'Close']
+    if features == ['Close'] :
+        return None
+    check_features(features , days=2)
+
+    longest = max([int(f.split('_')[1]) + 1 for f in features if '_' in f] + [2])
+    history = scaler.inverse_transform(np.asarray(scaled_history[-longest:] , dtype=np.float64))[: , target]
+    closes = np.repeat(history[None] , batch , axis=0)
+
+    def next_rows(predict) :
+        nonlocal closes
+        closes = np.concatenate([closes[: , 1:] , inverse_target(scaler , predict , target)[: , None]] , axis=1)
+        rows = np.column_stack([_feature(closes , f) for f in features])
+        return scaler.transform(rows).astype(np.float32)
+
+    return next_rows
+
+
+def inverse_target(scaler , values , target=0) :
+    # scalers fitted on several features are inverted column-wise through a padded matrix
+    values = np.asarray(values).reshape(-1)
+    width = getattr(scaler , "n_features_in_" , 1)
+
+    padded = np.zeros((len(values) , width) , dtype=np.float64)
+    padded[: , target] = values
+
+    return scaler.inverse_transform(padded)[: , target]
+
+
+def forecast(model , scaled_data , scaler , days , window=60 , features=None) :
+    check_features(features , days)
+    predict = rollout(model , scaled_data[None , -window:] , days , next_rows=feature_step(features , scaler , scaled_data))
+    return inverse_target(scaler , predict)
+
+def forecast_many(model , scaled_series , scalers , days , window=60) :
+    # one model, many tickers: every step is a single batched call
+    seeds = np.stack([series[-window:] for series in scaled_series])
+    predict = rollout(model , seeds , days)
+
+    return [inverse_target(scaler , row) for scaler , row in zip(scalers , predict)]
+
+def scenario_paths(model , scaled_data , scaler , days , paths=100 , noise=0.01 , window=60 , seed=None , features=None) :
+    check_features(features , days)
+    seeds = np.repeat(scaled_data[None , -window:] , paths , axis=0)
+    predict = rollout(model , seeds , days , noise=noise , seed=seed , next_rows=feature_step(features , scaler , scaled_data , batch=paths))
+
+    return inverse_target(scaler , predict).reshape(paths , days)
@@ -1,10 +1,13 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import yfinance as yf
+import price_store
 import datetime
 import helper
+import data_table
+import backtest
 import preprocessing_model
+import global_model
 from sklearn.metrics import mean_absolute_error , mean_squared_error , mean_absolute_percentage_error , r2_score
 
 def Forecasting(stock_symbol):
@@ -31,20 +34,51 @@ def Forecasting(stock_symbol):
     
     forecast = st.slider(label="How many days would you like to forecast ? ", min_value=1 , max_value=30, step=1)
 
-    data = yf.download(stock_symbol , start=start , end=end)
+    data = price_store.load_prices(stock_symbol , start=start , end=end)
 
+    if global_model.is_trained() :
+        if st.button('Forecast with Pooled Global Model') :
 
-    if st.button('Fit Model and Forecast') :
+            forecast_value = global_model.forecast_global(ticker=stock_symbol , data=data , days=forecast)
+            forecast_final = pd.DataFrame({"Date" : pd.bdate_range(start=end, periods=forecast) , "forecast" : forecast_value}).set_index("Date")
+
+            with st.expander("Forecasting" , expanded=True) :
+                st.table(forecast_final)  
+                st.plotly_chart(helper.line_plot(data=forecast_final , color='blue' , column='forecast'))
+
+    if st.button('Walk-Forward Backtest') :
 
         datasets = preprocessing_model.make_datasets(data=data)
 
-        scaled_data = preprocessing_model.scale_data(datasets=datasets)
+        progress_bar = st.progress(0 , text=f"Refitting over {backtest.FOLDS} expanding folds")
+        try :
+            per_fold , aggregate , predictions = backtest.walk_forward(datasets , progress=lambda done : progress_bar.progress(done))
+        except ValueError as error :
+            st.error(f"Backtest needs a longer date range : {error}")
+        else :
+            with st.expander("Walk-Forward Backtest" , expanded=True) :
+
+                train = data.iloc[:predictions.row.iloc[0]]
+                test = data.iloc[predictions.row.values].assign(prediction=predictions.prediction.values)
+                st.plotly_chart(helper.predictions_plot(train , test))
+
+                st.subheader("Aggregate")
+                st.dataframe(aggregate , use_container_width=True)
+                st.subheader("Per Fold")
+                st.dataframe(per_fold , use_container_width=True , hide_index=True)
+                st.caption("naive_RMSE repeats the previous close; a useful model should beat it.")
+
+    if st.button('Fit Model and Forecast') :
+
+        datasets = preprocessing_model.make_datasets(data=data)
 
         train_len =  preprocessing_model.split_num(datasets=datasets) 
 
-        x_train , y_train =  preprocessing_model.preprocessing( scaled_data=scaled_data["scaled_data"] , train_len=train_len)
+        model , scaled_data = preprocessing_model.fit_or_load(ticker=stock_symbol , datasets=datasets , train_len=train_len , mode="quick")
 
-        model =  preprocessing_model.modelling(x_train , y_train)
+        report = scaled_data.get("report")
+        if report :
+            st.caption(f"Trained {report['epochs']} epochs in {report['seconds']:.1f}s · {report['samples_per_sec']:,.0f} samples/sec")
 
         prediction =  preprocessing_model.test_data(model=model , datasets=datasets , scaled_data=scaled_data['scaled_data'] , train_len=train_len , scaler=scaled_data['scaler'])
 
@@ -60,8 +94,7 @@ def Forecasting(stock_symbol):
 
         with st.expander("Stock Data") : 
                 
-            with st.container(height=400) :
-                st.table(data) 
+            data_table.paged_table(data , key='forecast_data')
         
         with st.expander("prediction plot and metrics"):
 
@@ -93,8 +126,7 @@ def Forecasting(stock_symbol):
             st.divider()
 
         with st.expander("Prediction Data"):
-            with st.container(height=400) :
-                st.table(test[['Close' , 'prediction']])      
+            data_table.paged_table(test[['Close' , 'prediction']] , key='forecast_prediction')
 
 
         with st.expander("Forecasting") :
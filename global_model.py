@@ -0,0 +1,177 @@
+import os
+import json
+import pickle
+import argparse
+import numpy as np
+import pandas as pd
+import price_store
+import forecast_engine
+import streaming
+import features as feature_store
+
+
+GLOBAL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "global")
+EMBEDDING_DIM = 8
+
+_loaded = {}
+
+
+def _series_path(root , ticker) :
+    return os.path.join(root , "series" , f"{ticker.replace(os.sep , '_')}.npy")
+
+
+def prepare_universe(tickers , start , end , features=feature_store.DEFAULT_FEATURES , window=60 , root=GLOBAL_DIR) :
+    # per-ticker scaled float32 series on disk; training later reads them through memmaps
+    from sklearn.preprocessing import MinMaxScaler
+
+    os.makedirs(os.path.join(root , "series") , exist_ok=True)
+    scalers , kept = {} , []
+
+    for ticker in tickers :
+        data = price_store.load_prices(ticker , start=start , end=end)
+        if len(data) <= window + 1 :
+            continue
+
+        values , _ = feature_store.build_features(data , features)
+        if len(values) <= window + 1 :
+            continue
+
+        scaler = MinMaxScaler(feature_range=(0,1))
+        np.save(_series_path(root , ticker) , scaler.fit_transform(values).astype(np.float32))
+        scalers[ticker] = scaler
+        kept.append(ticker)
+
+    with open(os.path.join(root , "scalers.pkl") , "wb") as f :
+        pickle.dump(scalers , f)
+    with open(os.path.join(root , "universe.json") , "w") as f :
+        # id 0 is reserved for tickers the model has never seen
+        json.dump({"tickers" : {t : i + 1 for i , t in enumerate(kept)} , "features" : list(features) , "window" : window} , f)
+
+    return kept
+
+
+def _universe(root) :
+    with open(os.path.join(root , "universe.json")) as f :
+        return json.load(f)
+
+
+def window_batches(root , window , batch , embedding=True , seed=None) :
+    # endless random windows drawn uniformly over all tickers; only one batch is ever in memory
+    universe = _universe(root)
+    tickers = list(universe["tickers"])
+    series = [np.load(_series_path(root , t) , mmap_mode='r') for t in tickers]
+    ids = np.array([universe["tickers"][t] for t in tickers] , dtype=np.int32)
+
+    counts = np.array([len(s) - window for s in series])
+    offsets = np.concatenate(([0] , np.cumsum(counts)))
+    rng = np.random.default_rng(seed)
+
+    while True :
+        picks = rng.integers(0 , offsets[-1] , size=batch)
+        owner = np.searchsorted(offsets , picks , side='right') - 1
+        starts = picks - offsets[owner]
+
+        x = np.stack([series[o][s:s + window] for o , s in zip(owner , starts)])
+        y = np.array([series[o][s + window , 0] for o , s in zip(owner , starts)] , dtype=np.float32)
+
+        yield ((x , ids[owner][: , None]) , y) if embedding else (x , y)
+
+
+def build_model(window , n_features , n_tickers , embedding=True , function_activation='linear' , learning_rate=0.001) :
+    from keras.models import Model
+    from keras.layers import Input, LSTM, Dense, Embedding, Flatten, Concatenate
+    from keras.optimizers import Adam
+
+    sequence = Input(shape=(window , n_features))
+    hidden = LSTM(128 , return_sequences=True)(sequence)
+    hidden = LSTM(64 , return_sequences=False)(hidden)
+    inputs = [sequence]
+
+    if embedding :
+        ticker = Input(shape=(1,) , dtype='int32')
+        hidden = Concatenate()([hidden , Flatten()(Embedding(n_tickers + 1 , EMBEDDING_DIM)(ticker))])
+        inputs.append(ticker)
+
+    hidden = Dense(25 , activation=function_activation)(hidden)
+    model = Model(inputs=inputs , outputs=Dense(1)(hidden))
+    model.compile(optimizer=Adam(learning_rate=learning_rate) , loss='mean_squared_error')
+
+    return model
+
+
+def train_global(root=GLOBAL_DIR , epochs=5 , batch=256 , steps_per_epoch=500 , embedding=True , learning_rate=0.001 , seed=None) :
+    import tensorflow as tf
+
+    universe = _universe(root)
+    window = universe["window"]
+
+    n_features = len(universe["features"])
+
+    x_spec = tf.TensorSpec((None , window , n_features) , tf.float32)
+    if embedding :
+        x_spec = (x_spec , tf.TensorSpec((None , 1) , tf.int32))
+    dataset = streaming.generator_dataset(lambda : window_batches(root , window , batch , embedding=embedding , seed=seed) ,
+                                          output_signature=(x_spec , tf.TensorSpec((None ,) , tf.float32)))
+
+    model = build_model(window , n_features , len(universe["tickers"]) , embedding=embedding , learning_rate=learning_rate)
+    model.fit(dataset , steps_per_epoch=steps_per_epoch , epochs=epochs)
+
+    model.save(os.path.join(root , "model.keras"))
+    universe["embedding"] = embedding
+    with open(os.path.join(root , "universe.json") , "w") as f :
+        json.dump(universe , f)
+
+    _loaded.pop(root , None)
+    return model
+
+
+def is_trained(root=GLOBAL_DIR) :
+    return os.path.exists(os.path.join(root , "model.keras"))
+
+def load_global(root=GLOBAL_DIR) :
+    if root not in _loaded :
+        from keras.models import load_model
+        with open(os.path.join(root , "scalers.pkl") , "rb") as f :
+            scalers = pickle.load(f)
+        _loaded[root] = (load_model(os.path.join(root , "model.keras") , compile=False) , scalers , _universe(root))
+
+    return _loaded[root]
+
+
+def forecast_global(ticker , data , days , root=GLOBAL_DIR) :
+    # any ticker, no training: known tickers keep their scaler and embedding, new ones get id 0
+    from sklearn.preprocessing import MinMaxScaler
+
+    model , scalers , universe = load_global(root)
+    window = universe["window"]
+
+    values , _ = feature_store.build_features(data , universe["features"])
+    scaler = scalers.get(ticker)
+    if scaler is None :
+        scaler = MinMaxScaler(feature_range=(0,1)).fit(values)
+    scaled = scaler.transform(values)
+
+    extra = None
+    if universe.get("embedding" , True) :
+        extra = np.array([[universe["tickers"].get(ticker , 0)]] , dtype=np.int32)
+
+    forecast_engine.check_features(universe["features"] , days)
+    predict = forecast_engine.rollout(model , scaled[None , -window:] , days , extra=extra ,
+                                      next_rows=forecast_engine.feature_step(universe["features"] , scaler , scaled))
+    return forecast_engine.inverse_target(scaler , predict)
+
+
+if __name__ == "__main__" :
+    parser = argparse.ArgumentParser(description="Train one LSTM across the whole ticker list.")
+    parser.add_argument("--start" , default="2015-01-01")
+    parser.add_argument("--end" , default=str(pd.Timestamp.today().date()))
+    parser.add_argument("--window" , type=int , default=60)
+    parser.add_argument("--epochs" , type=int , default=5)
+    parser.add_argument("--batch" , type=int , default=256)
+    parser.add_argument("--steps" , type=int , default=500)
+    parser.add_argument("--no-embedding" , action="store_true")
+    args = parser.parse_args()
+
+    symbols = [f"{t}.JK" for t in pd.read_csv(os.path.join(os.path.dirname(os.path.abspath(__file__)) , "Ticker_list.csv"))["Ticker"]]
+    prepare_universe(symbols , start=args.start , end=args.end , window=args.window)
+    train_global(epochs=args.epochs , batch=args.batch , steps_per_epoch=args.steps , embedding=not args.no_embedding)
@@ -11,10 +11,11 @@ def Forecast():
     st.header("Pre-set Parameters")
     st.markdown("The LSTM model on this page comes with pre-configured parameters for ease of use. Users do not need to adjust these, as they have been optimized based on historical data. The pre-set parameters include:")
 
-    st.markdown("- Number of epochs: 1 ")
-    st.markdown("- Batch size: 1 ")
+    st.markdown("- Fit mode: quick ")
+    st.markdown("- Number of epochs: up to 15, stopped early when validation loss stops improving ")
+    st.markdown("- Batch size: 64 ")
     st.markdown("- Sequence length: 60 ")
-    st.markdown("- Learning rate: 0.0001 ")
+    st.markdown("- Learning rate: 0.001, halved when validation loss plateaus ")
     st.markdown("- Optimizer: Adam ")
     st.markdown("- Activition Function : linear")
     st.markdown("- Scaler : MinMaxScaler")
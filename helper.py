@@ -1,24 +1,35 @@
-import plotly.express as px
 import plotly.graph_objs as go
 import plotly.io as pio
 import numpy as np
+import downsample
+import panel
 
 pio.templates.default = "plotly"
 
-def line_plot(data , column , color):
-    fig = px.line(data, x=data.index, y=column, title=f'Stock {column} Price')
+# traces longer than MAX_POINTS are thinned before they are sent to the browser
+MAX_POINTS = downsample.MAX_POINTS
+WEBGL = False
+
+def _scatter(webgl) : 
+    return go.Scattergl if webgl else go.Scatter
+
+def line_plot(data , column , color , max_points=MAX_POINTS , webgl=WEBGL):
+    import plotly.express as px
+    data = data.iloc[downsample.minmax_indices(data[column].values , max_points)]
+    fig = px.line(data, x=data.index, y=column, title=f'Stock {column} Price' , render_mode='webgl' if webgl else 'auto')
     fig.update_traces(line_color=color)
     return fig
 
 
-def Overview_all(data , title , drop=False) : 
+def Overview_all(data , title , drop=False , max_points=MAX_POINTS , webgl=WEBGL) : 
     if drop == True:
       data = data.drop("Volume" , axis=1)
     
     fig = go.Figure()
 
     for column in data.columns:
-        fig.add_trace(go.Scatter(x=data.index, y=data[column], mode='lines', name=column))
+        x , y = downsample.minmax(data.index, data[column].values, max_points)
+        fig.add_trace(_scatter(webgl)(x=x, y=y, mode='lines', name=column))
 
     fig.update_layout(
         title=title,
@@ -30,16 +41,18 @@ def Overview_all(data , title , drop=False) :
     return fig
 
 def Histplot(data , columns , title) : 
+    import plotly.express as px
 
     fig = px.histogram(data, x=columns, nbins=50, title=title , marginal="violin")
     fig.update_layout(xaxis_title=columns, yaxis_title="Frequency")
 
     return fig
 
-def drawdown_plot(data) : 
+def drawdown_plot(data , max_points=MAX_POINTS , webgl=WEBGL) : 
     fig = go.Figure()
 
-    fig.add_trace(go.Scatter(x=data.index, y=data['Drawdown'], mode='lines', name='Drawdown',
+    x , y = downsample.minmax(data.index, data['Drawdown'].values, max_points)
+    fig.add_trace(_scatter(webgl)(x=x, y=y, mode='lines', name='Drawdown',
                             line=dict(color='red'), fill='tozeroy'))
 
     fig.update_layout(
@@ -53,9 +66,9 @@ def drawdown_plot(data) :
 
 
 
-def plot_with_dropdown(data, tickers):
+def plot_with_dropdown(data, tickers , max_points=MAX_POINTS , webgl=WEBGL):
 
-    data = data.reset_index()
+    data = panel.as_panel(data)
     
     columns = ['Open', 'High', 'Low', 'Close', 'Volume']
 
@@ -63,10 +76,11 @@ def plot_with_dropdown(data, tickers):
 
     for col in columns:
         for ticker in tickers:
-            ticker_data = data[data['ticker'] == ticker]
-            fig.add_trace(go.Scatter(
-                x=ticker_data['Date'],
-                y=ticker_data[col],
+            ticker_data = data.series(col , ticker)
+            x , y = downsample.minmax(ticker_data.index.values, ticker_data.values, max_points)
+            fig.add_trace(_scatter(webgl)(
+                x=x,
+                y=y,
                 mode='lines',
                 name=f"{ticker} - {col}",
                 visible='legendonly' if col != 'Close' else True  
@@ -94,16 +108,19 @@ def plot_with_dropdown(data, tickers):
 
     return fig
 
-def plot_daily_returns_dropdown(data, tickers):
+def plot_daily_returns_dropdown(data, tickers , max_points=MAX_POINTS , webgl=WEBGL):
  
+    data = panel.as_panel(data)
+
     fig = go.Figure()
 
     for ticker in tickers:
-        ticker_data = data[data['ticker'] == ticker]
+        ticker_data = data.series('Close' , ticker).pct_change()
+        x , y = downsample.minmax(ticker_data.index, ticker_data.values, max_points)
         fig.add_trace(
-            go.Scatter(
-                x=ticker_data.index,
-                y=ticker_data['Daily Return'],
+            _scatter(webgl)(
+                x=x,
+                y=y,
                 mode='lines',
                 name=ticker,
                 visible='legendonly' )
@@ -129,18 +146,21 @@ def plot_daily_returns_dropdown(data, tickers):
 
     return fig
 
-def plot_multi_line(data , hue , y , title='Closing Prices of Selected Stocks'):
+def plot_multi_line(data , hue , y , title='Closing Prices of Selected Stocks' , max_points=MAX_POINTS , webgl=WEBGL):
+    import plotly.express as px
 
-    
-    fig = px.line(data, x=data.index, y=y,color=hue, title=title)
+    data = downsample.downsample_groups(data , group=hue , y=y , max_points=max_points)
+    fig = px.line(data, x=data.index, y=y,color=hue, title=title , render_mode='webgl' if webgl else 'auto')
     
     return fig
 
 def heatmap(corr) : 
+    import plotly.express as px
 
     return px.imshow(corr,text_auto=True,  title='Matriks Korelasi Return Saham')
 
 def scatter_plot(x,y,data) : 
+    import plotly.express as px
     # Membuat scatter plot
     fig = px.scatter(
         data, 
@@ -154,6 +174,7 @@ def scatter_plot(x,y,data) :
     return fig
 
 def scatter_matrix(data) : 
+    import plotly.express as px
     col = data.columns
     
     fig = px.scatter_matrix(
@@ -209,10 +230,12 @@ def risk_plot(rets) :
     return fig
 
 
-def candle_plot(df,ticker=None, multi=False) :
+def candle_plot(df,ticker=None, multi=False , max_points=MAX_POINTS) :
 
     if multi == True : 
-        df = df[df.ticker == ticker]
+        df = panel.as_panel(df).frame(ticker).reset_index()
+
+    df = downsample.ohlc_buckets(df , max_points=max_points)
     
     
     
@@ -229,15 +252,18 @@ def candle_plot(df,ticker=None, multi=False) :
     return fig
     
 
-def predictions_plot(data_train , val) : 
+def predictions_plot(data_train , val , max_points=MAX_POINTS , webgl=WEBGL) : 
     fig = go.Figure()
 
-    fig.add_trace(go.Scatter(x=data_train.index, y=data_train['Close'], mode='lines', name='Train',
+    x , y = downsample.minmax(data_train.index, data_train['Close'].values, max_points)
+    fig.add_trace(_scatter(webgl)(x=x, y=y, mode='lines', name='Train',
                             line=dict(color='red')))
     
-    fig.add_trace(go.Scatter(x=val.index, y=val['Close'], mode='lines', name='Test',
+    x , y = downsample.minmax(val.index, val['Close'].values, max_points)
+    fig.add_trace(_scatter(webgl)(x=x, y=y, mode='lines', name='Test',
                             line=dict(color='blue')))
-    fig.add_trace(go.Scatter(x=val.index, y=val['prediction'], mode='lines', name='prediction',
+    x , y = downsample.minmax(val.index, val['prediction'].values, max_points)
+    fig.add_trace(_scatter(webgl)(x=x, y=y, mode='lines', name='prediction',
                             line=dict(color='green')))
     fig.update_layout(
         title='Prediction Plot',
@@ -0,0 +1,118 @@
+import json
+import numpy as np
+
+
+PARITY_TOLERANCE = 1e-4
+
+ACTIVATIONS = {
+    "linear" : lambda x : x ,
+    "relu" : lambda x : np.maximum(x , 0) ,
+    "tanh" : np.tanh ,
+    # 0.5 * (1 + tanh(x / 2)) is the logistic function without exp overflow
+    "sigmoid" : lambda x : 0.5 * (1 + np.tanh(0.5 * x)) ,
+}
+
+
+def _activation(layer) :
+    name = getattr(layer.activation , "__name__" , str(layer.activation))
+    if name not in ACTIVATIONS :
+        raise ValueError(f"unsupported activation: {name}")
+    return name
+
+
+def export(model , path=None , check=True) :
+    # LSTM and Dense weights of a Sequential model as plain arrays, optionally written to .npz
+    layers , arrays = [] , {}
+
+    for i , layer in enumerate(model.layers) :
+        kind = type(layer).__name__
+        weights = layer.get_weights()
+
+        if kind == "LSTM" :
+            if _activation(layer) != "tanh" or getattr(layer.recurrent_activation , "__name__" , "") != "sigmoid" :
+                raise ValueError("only tanh / sigmoid LSTM layers can be exported")
+            layers.append({"kind" : "lstm" , "return_sequences" : bool(layer.return_sequences)})
+        elif kind == "Dense" :
+            layers.append({"kind" : "dense" , "activation" : _activation(layer)})
+        else :
+            raise ValueError(f"unsupported layer: {kind}")
+
+        for j , weight in enumerate(weights) :
+            arrays[f"{i}_{j}"] = np.asarray(weight , dtype=np.float32)
+
+    lite = LiteModel(layers , arrays)
+
+    if check :
+        window = model.input_shape[1] or 60
+        parity(model , lite , np.random.default_rng(0).random((4 , window , model.input_shape[-1]) , dtype=np.float32))
+
+    if path is not None :
+        np.savez(path , layers=np.array(json.dumps(layers)) , **arrays)
+
+    return lite
+
+def load(path) :
+    with np.load(path) as stored :
+        arrays = {name : stored[name] for name in stored.files if name != "layers"}
+        return LiteModel(json.loads(str(stored["layers"])) , arrays)
+
+
+def parity(model , lite , windows , tolerance=PARITY_TOLERANCE) :
+    # max absolute difference to the Keras forward pass; raises when the export drifted
+    expected = np.asarray(model(windows , training=False))
+    error = float(np.max(np.abs(expected - lite(windows))))
+
+    if error > tolerance :
+        raise ValueError(f"NumPy forward pass differs from Keras by {error:.2e}")
+
+    return error
+
+
+class LiteModel :
+    # inference-only forward pass, callable like a Keras model so forecast_engine can use either
+
+    def __init__(self , layers , arrays) :
+        self.layers = layers
+        self.weights = [[arrays[f"{i}_{j}"] for j in range(3 if layer["kind"] == "lstm" else 2)] for i , layer in enumerate(layers)]
+
+    def __call__(self , x , training=False) :
+        x = np.asarray(x , dtype=np.float32)
+
+        for layer , weights in zip(self.layers , self.weights) :
+            if layer["kind"] == "lstm" :
+                x = self._lstm(x , *weights , return_sequences=layer["return_sequences"])
+            else :
+                kernel , bias = weights
+                x = ACTIVATIONS[layer["activation"]](x @ kernel + bias)
+
+        return x
+
+    def predict(self , x , verbose=0 , batch_size=None) :
+        return self(x)
+
+    @staticmethod
+    def _lstm(x , kernel , recurrent , bias , return_sequences) :
+        # gate order i, f, c, o as Keras stores them; the input projection is one matmul for all steps
+        batch , steps , _ = x.shape
+        units = recurrent.shape[0]
+        projected = x @ kernel + bias
+
+        h = np.zeros((batch , units) , dtype=np.float32)
+        c = np.zeros((batch , units) , dtype=np.float32)
+        outputs = np.empty((batch , steps , units) , dtype=np.float32) if return_sequences else None
+        sigmoid = ACTIVATIONS["sigmoid"]
+
+        for t in range(steps) :
+            z = projected[: , t] + h @ recurrent
+            i = sigmoid(z[: , :units])
+            f = sigmoid(z[: , units:2 * units])
+            g = np.tanh(z[: , 2 * units:3 * units])
+            o = sigmoid(z[: , 3 * units:])
+
+            c = f * c + i * g
+            h = o * np.tanh(c)
+
+            if return_sequences :
+                outputs[: , t] = h
+
+        return outputs if return_sequences else h
@@ -0,0 +1,156 @@
+import numpy as np
+from collections import namedtuple
+
+
+RISK_FREE = 0.02/225
+TARGET_RETURN = 0.02
+OMEGA_THRESHOLD = 0.02
+PERIODS = 252
+
+Metrics = namedtuple("Metrics" , ["observations" , "mean_return" , "volatility" , "cagr" , "max_drawdown" , "max_drawdown_bars" ,
+                                  "sharpe" , "sortino" , "calmar" , "omega" ,
+                                  "information" , "upside_capture" , "downside_capture" , "beta"])
+
+
+def returns_from_prices(prices) :
+    prices = np.asarray(prices , dtype=np.float64)
+    return prices[1:] / prices[:-1] - 1
+
+def _clean(returns) :
+    returns = np.asarray(returns , dtype=np.float64)
+    return returns[~np.isnan(returns)]
+
+def _ratio(num , den) :
+    return num / den if den != 0 and not np.isnan(den) else np.nan
+
+def _mean(values) :
+    return values.mean() if len(values) else np.nan
+
+
+def sharpe(returns , risk=RISK_FREE) :
+    excess = _clean(returns) - risk
+    if len(excess) < 2 :
+        return np.nan
+    return np.sqrt(PERIODS) * _ratio(excess.mean() , excess.std(ddof=1))
+
+def sortino(returns , target=TARGET_RETURN) :
+    returns = _clean(returns)
+    downside = returns[returns < target]
+    downside_deviation = np.sqrt(_mean((downside - target) ** 2))
+    return _ratio(_mean(returns) - target , downside_deviation)
+
+def omega(returns , threshold=OMEGA_THRESHOLD) :
+    returns = _clean(returns)
+    above = returns[returns > threshold].sum()
+    below = -returns[returns < threshold].sum()
+    return _ratio(above , below)
+
+def wealth_index(returns) :
+    # growth of 1 unit, with the starting point included like the first price
+    return np.concatenate(([1.0] , np.cumprod(1 + _clean(returns))))
+
+def max_drawdown(returns) :
+    wealth = wealth_index(returns)
+    peak = np.maximum.accumulate(wealth)
+    return (wealth / peak - 1).min()
+
+def cagr(returns) :
+    wealth = wealth_index(returns)
+    return wealth[-1] ** (PERIODS / len(wealth)) - 1
+
+def calmar(returns) :
+    return _ratio(cagr(returns) , max_drawdown(returns))
+
+
+Episodes = namedtuple("Episodes" , ["start" , "trough" , "recovery" , "depth" , "duration"])
+
+def drawdown_episodes(prices , dates=None) :
+    # one scan: every underwater run is an episode; recovery is -1 while still underwater
+    prices = np.asarray(prices , dtype=np.float64)
+    peak = np.fmax.accumulate(prices)
+    drawdown = prices / peak - 1
+    underwater = drawdown < 0
+
+    edges = np.diff(np.concatenate(([0] , underwater.astype(np.int8) , [0])))
+    starts = np.flatnonzero(edges == 1)
+    stops = np.flatnonzero(edges == -1)
+
+    troughs = np.array([start + np.argmin(drawdown[start:stop]) for start , stop in zip(starts , stops)] , dtype=np.int64)
+    recovered = stops < len(prices)
+    recovery = np.where(recovered , stops , -1)
+
+    if dates is None :
+        duration = np.where(recovered , stops - starts , -1)
+    else :
+        dates = np.asarray(dates , dtype='datetime64[D]')
+        ends = dates[np.minimum(stops , len(prices) - 1)]
+        duration = np.where(recovered , (ends - dates[starts]).astype(np.int64) , -1)
+
+    return Episodes(start=starts , trough=troughs , recovery=recovery ,
+                    depth=drawdown[troughs] if len(troughs) else np.empty(0) , duration=duration)
+
+def max_drawdown_duration(episodes) :
+    # only recovered episodes have a duration, like the original per-date scan
+    recovered = episodes.duration[episodes.duration >= 0]
+    return recovered.max() if len(recovered) else None
+
+
+def _aligned(returns , benchmark) :
+    returns = np.asarray(returns , dtype=np.float64)
+    benchmark = np.asarray(benchmark , dtype=np.float64)
+    mask = ~(np.isnan(returns) | np.isnan(benchmark))
+    return returns[mask] , benchmark[mask]
+
+def information(returns , benchmark) :
+    returns , benchmark = _aligned(returns , benchmark)
+    active = returns - benchmark
+    if len(active) < 2 :
+        return np.nan
+    return _ratio(active.mean() , active.std(ddof=1))
+
+def capture(returns , benchmark) :
+    returns , benchmark = _aligned(returns , benchmark)
+    up , down = benchmark > 0 , benchmark < 0
+    upside = _ratio(_mean(returns[up]) , _mean(benchmark[up])) * 100
+    downside = _ratio(_mean(returns[down]) , _mean(benchmark[down])) * 100
+    return upside , downside
+
+def beta(returns , benchmark) :
+    returns , benchmark = _aligned(returns , benchmark)
+    if len(returns) < 2 :
+        return np.nan
+    return _ratio(np.cov(returns , benchmark)[0 , 1] , np.var(benchmark))
+
+
+def compute_metrics(returns , benchmark=None , aligned=None) :
+    # every ratio from one returns array; aligned are the returns on the benchmark's dates
+    with np.errstate(divide='ignore' , invalid='ignore') :
+        clean = _clean(returns)
+
+        if benchmark is None :
+            info , upside , downside , market_beta = np.nan , np.nan , np.nan , np.nan
+        else :
+            aligned = returns if aligned is None else aligned
+            info = information(aligned , benchmark)
+            upside , downside = capture(aligned , benchmark)
+            market_beta = beta(aligned , benchmark)
+
+        wealth = wealth_index(clean)
+        drawdown = (wealth / np.maximum.accumulate(wealth) - 1).min()
+        growth = wealth[-1] ** (PERIODS / len(wealth)) - 1
+
+        return Metrics(observations=len(clean) ,
+                       mean_return=_mean(clean) ,
+                       volatility=clean.std(ddof=1) if len(clean) > 1 else np.nan ,
+                       cagr=growth ,
+                       max_drawdown=drawdown ,
+                       # no dates here, so counted in bars; preprocessing.calculate_drawdown_duration counts calendar days
+                       max_drawdown_bars=max_drawdown_duration(drawdown_episodes(wealth)) ,
+                       sharpe=sharpe(clean) ,
+                       sortino=sortino(clean) ,
+                       calmar=_ratio(growth , drawdown) ,
+                       omega=omega(clean) ,
+                       information=info ,
+                       upside_capture=upside ,
+                       downside_capture=downside ,
+                       beta=market_beta)
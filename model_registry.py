@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import pickle
+import shutil
+import hashlib
+import threading
+import numpy as np
+import lite_inference
+
+
+REGISTRY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "models")
+MAX_ENTRIES = 50
+MAX_BYTES = 1024 * 1024 * 1024
+
+_lock = threading.Lock()
+
+
+def data_fingerprint(datasets) :
+    values = np.ascontiguousarray(datasets)
+    digest = hashlib.blake2b(values.tobytes() , digest_size=16)
+    digest.update(str((values.shape , values.dtype.str)).encode())
+    return digest.hexdigest()
+
+def make_key(ticker , datasets , **params) :
+    payload = json.dumps({"ticker" : ticker ,
+                          "data" : data_fingerprint(datasets) ,
+                          "params" : params} , sort_keys=True , default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def _index_path(root) :
+    return os.path.join(root , "index.json")
+
+def _read_index(root) :
+    try :
+        with open(_index_path(root)) as f :
+            return json.load(f)
+    except (FileNotFoundError , json.JSONDecodeError) :
+        return {}
+
+def _write_index(index , root) :
+    os.makedirs(root , exist_ok=True)
+    tmp = f"{_index_path(root)}.{os.getpid()}.tmp"
+    with open(tmp , "w") as f :
+        json.dump(index , f)
+    os.replace(tmp , _index_path(root))
+
+def _dir_size(path) :
+    return sum(os.path.getsize(os.path.join(base , name)) for base , _ , names in os.walk(path) for name in names)
+
+
+def load(key , root=REGISTRY_DIR , lite=False) :
+    # lite: the exported NumPy forward pass when there is one, no Keras model is deserialized
+    path = os.path.join(root , key)
+
+    with _lock :
+        index = _read_index(root)
+        if key not in index or not os.path.isdir(path) :
+            return None
+
+        if lite and os.path.exists(os.path.join(path , "model.npz")) :
+            model = lite_inference.load(os.path.join(path , "model.npz"))
+        else :
+            from keras.models import load_model
+            model = load_model(os.path.join(path , "model.keras") , compile=False)
+        with open(os.path.join(path , "scaler.pkl") , "rb") as f :
+            scaler = pickle.load(f)
+
+        index[key]["last_used"] = time.time()
+        _write_index(index , root)
+
+    return {"model" : model , "scaler" : scaler , "meta" : index[key]}
+
+def latest(ticker , match , root=REGISTRY_DIR) :
+    # most recently used entry of this ticker trained with the same configuration
+    with _lock :
+        index = _read_index(root)
+
+    keys = [k for k , meta in index.items()
+            if meta.get("ticker") == ticker and all(meta.get(name) == value for name , value in match.items())]
+    if not keys :
+        return None
+
+    key = max(keys , key=lambda k : index[k]["last_used"])
+    entry = load(key , root=root)
+    return None if entry is None else dict(entry , key=key)
+
+def remove(key , root=REGISTRY_DIR) :
+    with _lock :
+        index = _read_index(root)
+        if index.pop(key , None) is not None :
+            _write_index(index , root)
+        shutil.rmtree(os.path.join(root , key) , ignore_errors=True)
+
+def save(key , model , scaler , meta=None , root=REGISTRY_DIR , max_entries=MAX_ENTRIES , max_bytes=MAX_BYTES) :
+    path = os.path.join(root , key)
+    tmp = f"{path}.{os.getpid()}.tmp"
+
+    with _lock :
+        shutil.rmtree(tmp , ignore_errors=True)
+        os.makedirs(tmp)
+        model.save(os.path.join(tmp , "model.keras"))
+        try :
+            lite_inference.export(model , os.path.join(tmp , "model.npz"))
+        except ValueError :
+            # architectures the NumPy runtime does not cover are served by Keras only
+            pass
+        with open(os.path.join(tmp , "scaler.pkl") , "wb") as f :
+            pickle.dump(scaler , f)
+
+        shutil.rmtree(path , ignore_errors=True)
+        os.replace(tmp , path)
+
+        index = _read_index(root)
+        index[key] = dict(meta or {} , last_used=time.time() , size=_dir_size(path))
+        index = evict(index , root , max_entries=max_entries , max_bytes=max_bytes , keep=key)
+        _write_index(index , root)
+
+def evict(index , root=REGISTRY_DIR , max_entries=MAX_ENTRIES , max_bytes=MAX_BYTES , keep=None) :
+    # least recently used first, the entry just written is never dropped
+    order = sorted((k for k in index if k != keep) , key=lambda k : index[k]["last_used"])
+    total = sum(entry["size"] for entry in index.values())
+
+    while order and (len(index) > max_entries or total > max_bytes) :
+        key = order.pop(0)
+        total -= index.pop(key)["size"]
+        shutil.rmtree(os.path.join(root , key) , ignore_errors=True)
+
+    return index
@@ -0,0 +1,85 @@
+import hashlib
+import numpy as np
+import pandas as pd
+
+
+FIELDS = ['Close' , 'High' , 'Low' , 'Open' , 'Volume']
+
+
+class Panel :
+    # every field is one dense float32 (dates x tickers) array; built once, read-only afterwards
+
+    def __init__(self , dates , tickers , fields) :
+        self.dates = pd.DatetimeIndex(dates , name='Date')
+        self.tickers = list(tickers)
+        self.position = {t : i for i , t in enumerate(self.tickers)}
+        self.fields = fields
+
+        for values in fields.values() :
+            values.flags.writeable = False
+
+        # rows where each ticker actually traded, one column per ticker
+        self.present = ~np.isnan(fields['Close']) if 'Close' in fields else np.ones((len(self.dates) , len(self.tickers)) , dtype=bool)
+
+        digest = hashlib.blake2b(repr((self.tickers , sorted(fields))).encode() , digest_size=16)
+        digest.update(self.dates.asi8.tobytes())
+        for name in sorted(fields) :
+            digest.update(np.ascontiguousarray(fields[name]).tobytes())
+        self.key = digest.hexdigest()
+
+    @classmethod
+    def from_long(cls , data , ticker_col='ticker' , fields=FIELDS) :
+        # one scatter per field instead of a pivot_table; the date may be the index or a 'Date' column
+        dates = pd.DatetimeIndex(data['Date'] if 'Date' in data.columns else data.index)
+        codes , tickers = pd.factorize(data[ticker_col] , sort=False)
+        unique_dates , rows = np.unique(dates.values , return_inverse=True)
+
+        arrays = {}
+        for field in fields :
+            if field not in data.columns :
+                continue
+            values = np.full((len(unique_dates) , len(tickers)) , np.nan , dtype=np.float32)
+            values[rows , codes] = data[field].values
+            arrays[field] = values
+
+        return cls(unique_dates , [str(t) for t in tickers] , arrays)
+
+    def cache_key(self) :
+        return self.key
+
+    # read-only, so copies can share it
+    def __copy__(self) :
+        return self
+
+    def __deepcopy__(self , memo) :
+        return self
+
+    def __len__(self) :
+        return len(self.tickers)
+
+    def __contains__(self , ticker) :
+        return ticker in self.position
+
+    def column(self , field , ticker) :
+        # strided view of one ticker, no copy, NaN on dates it did not trade
+        return self.fields[field][: , self.position[ticker]]
+
+    def series(self , field , ticker) :
+        i = self.position[ticker]
+        mask = self.present[: , i]
+        return pd.Series(self.fields[field][mask , i] , index=self.dates[mask] , name=field)
+
+    def frame(self , ticker , fields=None) :
+        # what data[data.ticker == ticker] gave, without scanning the long frame
+        i = self.position[ticker]
+        mask = self.present[: , i]
+        names = [f for f in (fields or FIELDS) if f in self.fields]
+        return pd.DataFrame({f : self.fields[f][mask , i] for f in names} , index=self.dates[mask])
+
+    def wide(self , field) :
+        # dates x tickers frame over the stored array, replaces pivot_table(index='Date', columns='ticker')
+        return pd.DataFrame(self.fields[field] , index=self.dates , columns=pd.Index(self.tickers , name='ticker') , copy=False)
+
+
+def as_panel(data , ticker_col='ticker') :
+    return data if isinstance(data , Panel) else Panel.from_long(data , ticker_col=ticker_col)
@@ -1,19 +1,32 @@
-import yfinance as yf
-import plotly.express as px
-import plotly.graph_objs as go
+import cache
+import metrics
+import price_store
+import fetcher
+import panel
 import numpy as np
 import pandas as pd
 
 
 
 def Get_Analysis_Data(start , end , ticker ) : 
-    data = yf.download(ticker , start=start , end=end)
+    data = price_store.load_prices(ticker , start=start , end=end)
     return data
 
 def Get_compare_data(start , end, ticker = '^GSPC'):
-    data = yf.download(ticker , start=start , end=end)
+    data = price_store.load_prices(ticker , start=start , end=end)
     return data
 
+def _returns(data) : 
+    return data['Close'].pct_change().values
+
+def _aligned_returns(data , benchmark_data) : 
+    returns = data['Close'].pct_change()
+    benchmark_returns = benchmark_data['Close'].pct_change()
+    common_index = returns.index.intersection(benchmark_returns.index)
+
+    return returns.loc[common_index].values , benchmark_returns.loc[common_index].values
+
+@cache.memoize
 def Get_Return(data , num=100) : 
     data["return"] = data["Close"].pct_change()
 
@@ -23,10 +36,11 @@ def Get_Return(data , num=100) :
 
     return data
 
+@cache.memoize
 def Rolling(data ,stock=None, roll = [7,30,90,200] , multi=False ) : 
 
     if multi == True :
-        data = data[data.ticker == stock]
+        data = panel.as_panel(data).frame(stock)
     data = data.filter(['Close'])
 
     for w in roll : 
@@ -34,6 +48,7 @@ def Rolling(data ,stock=None, roll = [7,30,90,200] , multi=False ) :
     
     return data
 
+@cache.memoize
 def Rolling_volatility(data) : 
     data = data.filter(['Close'])
     data["return"] = data.pct_change()
@@ -44,18 +59,17 @@ def Rolling_volatility(data) :
 
     return data[['rolling_7','rolling_30','rolling_90']]
 
+@cache.memoize
 def sharpe_ratio(data) : 
-    risk = 0.02/225
-
-    data['returns'] = data['Close'].pct_change(1)
-    data['excess_returns'] = data['returns'] - risk
-
-    sharpe_ratio = np.sqrt(252) * data['excess_returns'].mean() / data["excess_returns"].std()
-    return sharpe_ratio
+    return metrics.sharpe(_returns(data))
 
+@cache.memoize
 def sharpe_ratio_rol(data) : 
     rolling_window = 30 
 
+    if 'excess_returns' not in data :
+        data['excess_returns'] = data['Close'].pct_change(1) - 0.02/225
+
     rolling_mean = data['excess_returns'].rolling(window=rolling_window).mean()
     rolling_std = data['excess_returns'].rolling(window=rolling_window).std()
 
@@ -65,11 +79,13 @@ def sharpe_ratio_rol(data) :
 
     return data
 
+@cache.memoize
 def hist_return_data(data):
     data["return"] = data['Close'].pct_change()
 
     return data.filter(['return'])
 
+@cache.memoize
 def compare_data_merge (data , compare) :
 
     data = data.filter(['Close']).pct_change()
@@ -81,6 +97,7 @@ def compare_data_merge (data , compare) :
     return final_data
 
 
+@cache.memoize
 def data_drawdown(data) : 
     
     data['Peak'] = data['Close'].cummax()  
@@ -88,6 +105,7 @@ def data_drawdown(data) :
 
     return data
 
+@cache.memoize
 def treshold_return(data) : 
     data['return'] = data.filter(['Close']).pct_change()
 
@@ -98,122 +116,91 @@ def treshold_return(data) :
     return data
 
 
-def calculate_drawdown_duration(data):
-    
-    drawdown_starts = data[data['Drawdown'] < 0].index
-    drawdown_ends = data[data['Close'] >= data['Peak']].index
-    
-    durations = []
-    for start in drawdown_starts:
-        end = drawdown_ends[drawdown_ends >= start]
-        if not end.empty:
-            duration = (end[0] - start).days
-            durations.append(duration)
-    
-    if not durations:
-        return None
-    
-    max_duration = max(durations)
-    
-    return max_duration
+@cache.memoize
+def drawdown_episodes(data) : 
+    episodes = metrics.drawdown_episodes(data['Close'].values , dates=data.index.values)
+    dates = data.index
 
-def sortino_ratio(data, target_return=0.02):
-    data['returns'] = data['Close'].pct_change()
-    
-    mean_return = data['returns'].mean()
-    
-    downside_returns = data['returns'][data['returns'] < target_return]
-    downside_deviation = np.sqrt((downside_returns - target_return).pow(2).mean())
-    
-    sortino_ratio = (mean_return - target_return) / downside_deviation
-    
-    return sortino_ratio
+    return pd.DataFrame({
+        "start" : dates[episodes.start] ,
+        "trough" : dates[episodes.trough] ,
+        "recovery" : [dates[i] if i >= 0 else pd.NaT for i in episodes.recovery] ,
+        "depth" : episodes.depth ,
+        "duration" : pd.array([d if d >= 0 else None for d in episodes.duration] , dtype="Int64") ,
+    })
 
-def calculate_calmar_ratio(data):
+@cache.memoize
+def calculate_drawdown_duration(data):
+    episodes = metrics.drawdown_episodes(data['Close'].values , dates=data.index.values)
+    max_duration = metrics.max_drawdown_duration(episodes)
 
-    initial_value = data['Close'].iloc[0]
-    final_value = data['Close'].iloc[-1]
-    periods = len(data) / 252  
-    cagr = (final_value / initial_value) ** (1 / periods) - 1
+    return None if max_duration is None else int(max_duration)
 
-    max_drawdown = data_drawdown(data).Drawdown.min()    
+@cache.memoize
+def sortino_ratio(data, target_return=0.02):
+    return metrics.sortino(_returns(data) , target=target_return)
 
-    calmar_ratio = cagr / max_drawdown if max_drawdown != 0 else np.nan
-    
-    return calmar_ratio
+@cache.memoize
+def calculate_calmar_ratio(data):
+    return metrics.calmar(_returns(data))
 
 
 
+@cache.memoize
 def calculate_information_ratio(portfolio_data, benchmark_data):
+    portfolio_returns , benchmark_returns = _aligned_returns(portfolio_data , benchmark_data)
+    return metrics.information(portfolio_returns , benchmark_returns)
 
-    portfolio_data['returns'] = portfolio_data['Close'].pct_change()
-    benchmark_data['returns'] = benchmark_data['Close'].pct_change()
-    
-    common_index = portfolio_data.index.intersection(benchmark_data.index)
-
-    portfolio_returns = portfolio_data.loc[common_index, 'returns']
-    benchmark_returns = benchmark_data.loc[common_index, 'returns']
-    
-    active_return = portfolio_returns - benchmark_returns
-    tracking_error = active_return.std()
-    information_ratio = active_return.mean() / tracking_error if tracking_error != 0 else np.nan
-    
-    return information_ratio
-
+@cache.memoize
 def omega_ratio(data, threshold=0.02):
- 
-    data['returns'] = data['Close'].pct_change().dropna()
-    
-    above_threshold = data['returns'][data['returns'] > threshold].sum()
-    below_threshold = -data['returns'][data['returns'] < threshold].sum()  
-    
-    omega_ratio_value = above_threshold / below_threshold if below_threshold != 0 else np.nan
-    
-    return omega_ratio_value
+    return metrics.omega(_returns(data) , threshold=threshold)
 
+@cache.memoize
 def calculate_capture_ratios(investment_data, benchmark_data):
-
-    investment_data['returns'] = investment_data['Close'].pct_change().dropna()
-    benchmark_data['returns'] = benchmark_data['Close'].pct_change().dropna()
-    
-    common_index = investment_data.index.intersection(benchmark_data.index)
-    investment_returns = investment_data.loc[common_index, 'returns']
-    benchmark_returns = benchmark_data.loc[common_index, 'returns']
-    
-    up_market = benchmark_returns > 0
-    down_market = benchmark_returns < 0
-    
-    upside_capture = investment_returns[up_market].mean() / benchmark_returns[up_market].mean() * 100 if benchmark_returns[up_market].mean() != 0 else np.nan
-    downside_capture = investment_returns[down_market].mean() / benchmark_returns[down_market].mean() * 100 if benchmark_returns[down_market].mean() != 0 else np.nan
+    investment_returns , benchmark_returns = _aligned_returns(investment_data , benchmark_data)
+    upside_capture , downside_capture = metrics.capture(investment_returns , benchmark_returns)
     
     return {
         'Upside Capture Ratio': upside_capture,
         'Downside Capture Ratio': downside_capture
     }
 
+@cache.memoize
 def calculate_beta(stock_returns, market_returns):
-    covariance = np.cov(stock_returns, market_returns)[0, 1]
-    
-    variance_market = np.var(market_returns)
-    
-    # Menghitung Beta
-    beta = covariance / variance_market
-    
-    return beta
+    return metrics.beta(stock_returns , market_returns)
 
-def download_multistock_data(tickers, start_date, end_date):
-    data = yf.download(tickers, start=start_date, end=end_date, group_by='ticker')
+@cache.memoize
+def metrics_summary(data , benchmark_data=None) : 
+    if benchmark_data is None :
+        return metrics.compute_metrics(_returns(data))
 
-    df_list = []
-    for ticker in tickers:
-        df = data[ticker].copy() 
-        df['ticker'] = ticker 
-        df_list.append(df)   
+    aligned , benchmark_returns = _aligned_returns(data , benchmark_data)
+    return metrics.compute_metrics(_returns(data) , benchmark=benchmark_returns , aligned=aligned)
 
-    final_data = pd.concat(df_list)
+def Get_analysis_and_compare(start , end , ticker , benchmark='^GSPC') : 
+    # stock and benchmark are fetched at the same time
+    frames , errors = fetcher.fetch_many([ticker , benchmark] , start=start , end=end)
+    if ticker not in frames :
+        raise ValueError(f"{ticker}: {errors.get(ticker)}")
+
+    return frames[ticker] , frames.get(benchmark , pd.DataFrame())
+
+def download_multistock_data(tickers, start_date, end_date):
+    # concurrent, rate limited and retried; tickers that still fail are listed in .attrs['errors']
+    frames , errors = fetcher.fetch_many(tickers , start=start_date , end=end_date)
+
+    df_list = [df.assign(ticker=ticker) for ticker , df in frames.items()]
+    final_data = pd.concat(df_list) if df_list else pd.DataFrame(columns=['Close' , 'High' , 'Low' , 'Open' , 'Volume' , 'ticker'])
+    final_data.attrs['errors'] = errors
 
     return final_data
 
+@cache.memoize
+def build_panel(data) :
+    # once per download; every per-ticker slice and pivot below reads from it
+    return panel.Panel.from_long(data)
+
+@cache.memoize
 def calculate_daily_returns_multi(data):
    
     data = data.copy()
@@ -221,9 +208,11 @@ def calculate_daily_returns_multi(data):
     data['Cumulative Return'] = (1 + data['Daily Return']).groupby(data['ticker']).cumprod() - 1
     return data
 
-def calculate_atr(data , ticker) : 
+@cache.memoize
+def calculate_atr(data , ticker=None) : 
 
-    stock_data = data[data.ticker == ticker]
+    # a single-ticker frame when ticker is None, otherwise a Panel or the long multi-ticker frame
+    stock_data = data if ticker is None else panel.as_panel(data).frame(ticker)
 
     stock_data['high-low'] = stock_data['High'] - stock_data['Low']
     stock_data['high-close'] = (stock_data['High'] - stock_data['Close'].shift()).abs()
@@ -235,9 +224,11 @@ def calculate_atr(data , ticker) :
     return stock_data[['rolling_14' , 'rolling_30']]
 
 def corr_data(data, columns='Close') : 
-    return data.pivot_table(index='Date' , columns='ticker' , values=columns)
+    # dates x tickers view over the panel, not memoized since there is nothing left to compute
+    return panel.as_panel(data).wide(columns)
 
 
+@cache.memoize
 def annot_cum_and_return(data , operator , column):
 
     subset = data.groupby(['ticker'])[column].last().reset_index()
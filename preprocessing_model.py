@@ -1,15 +1,62 @@
+import time
 import numpy as np
+import windowing
+import model_registry
+import forecast_engine
+import streaming
+import features as feature_store
 
-from keras.models import Sequential
-from keras.layers import Dense , LSTM 
-from keras.optimizers import Adam, SGD, RMSprop, Adagrad, Adadelta
-from sklearn.preprocessing import StandardScaler, MinMaxScaler, RobustScaler, Normalizer
-from sklearn.metrics import mean_absolute_error , mean_squared_error , mean_absolute_percentage_error , r2_score
+# keras and scikit-learn are imported where they are used, importing this module stays cheap
 
 
+# batch sizes that keep a CPU busy; epochs are an upper bound, early stopping usually ends sooner
+FIT_MODES = {
+    "quick" : dict(batch=64 , epoch=15 , learning_rate=0.001 , patience=2) ,
+    "balanced" : dict(batch=32 , epoch=40 , learning_rate=0.001 , patience=4) ,
+    "thorough" : dict(batch=32 , epoch=150 , learning_rate=0.0005 , patience=8) ,
+}
+PATIENCE = 4
+UPDATE_EPOCHS = 3
+MAX_UPDATES = 20
+VALIDATION = 0.1
+MIN_VALIDATION = 20
+
+
+def fit_report(samples) :
+    # wall time, epochs actually run and training throughput of one fit() call, filled into .report
+    from keras.callbacks import LambdaCallback
+
+    state = {}
+
+    def begin(logs=None) :
+        state.update(started=time.perf_counter() , epochs=0 , best=None)
+
+    def epoch_end(epoch , logs=None) :
+        state["epochs"] += 1
+        loss = (logs or {}).get("val_loss")
+        if loss is not None and (state["best"] is None or loss < state["best"]) :
+            state["best"] = float(loss)
+
+    def end(logs=None) :
+        seconds = time.perf_counter() - state["started"]
+        callback.report.update({"epochs" : state["epochs"] , "seconds" : seconds , "samples" : samples ,
+                                "samples_per_sec" : samples * state["epochs"] / seconds if seconds else 0.0 , "val_loss" : state["best"]})
+
+    callback = LambdaCallback(on_train_begin=begin , on_epoch_end=epoch_end , on_train_end=end)
+    callback.report = {}
+    return callback
+
+
+def fit_callbacks(patience=PATIENCE) :
+    from keras.callbacks import EarlyStopping, ReduceLROnPlateau
+
+    # best weights are restored, so stopping late never costs accuracy
+    return [EarlyStopping(monitor='val_loss' , patience=patience , restore_best_weights=True) ,
+            ReduceLROnPlateau(monitor='val_loss' , factor=0.5 , patience=max(1 , patience // 2) , min_lr=1e-6)]
 
 
 def scale_data(datasets , scale = 'MinMaxScaler'):
+    from sklearn.preprocessing import StandardScaler, MinMaxScaler, RobustScaler, Normalizer
 
     if scale == "MinMaxScaler" :
         scaler = MinMaxScaler(feature_range=(0,1))
@@ -29,42 +76,45 @@ def split_num( datasets , size=.8) :
     return train_len
 
 
-def make_datasets(data) : 
-    data= data.filter(['Close'])
-    datasets = data.values
+def make_datasets(data , features=None) : 
+    # float32 feature matrix, Close first; only Close unless features are asked for
+    datasets , _ = feature_store.build_features(data , features or feature_store.DEFAULT_FEATURES)
     return datasets
 
 def preprocessing(train_len , scaled_data , window=60) : 
 
     x_train , y_train = train_data (scaled_data=scaled_data , train_len=train_len , window=window) 
-    x_train = np.reshape(x_train, (x_train.shape[0], x_train.shape[1], 1)) 
 
     return x_train , y_train
 
 
 def train_data(scaled_data , train_len , window) :
 
-    train_data = scaled_data[0:train_len , :]
+    # strided (samples, window, features) view, Keras copies per batch
+    x_train , y_train = windowing.train_windows(scaled_data , train_len=train_len , window=window)
 
-    x_train = [] 
-    y_train = []
+    return x_train , y_train
 
-    for i in range(window , len(train_data)):
-        x_train.append(scaled_data[i-window : i ,   0])
-        y_train.append(scaled_data[i , 0])
 
-    x_train , y_train = np.array(x_train) , np.array(y_train)
+def streaming_data(scaled_data , train_len , window=60 , batch=32 , start=None , shuffle=True) :
 
-    return x_train , y_train
+    # windows are cut per batch from the scaled array, training memory stays O(batch)
+    return streaming.window_dataset(scaled_data , start=window if start is None else start , stop=train_len , window=window , batch=batch , shuffle=shuffle)
 
 
-def modelling(x_train , y_train , batch=1 , epoch=1 ,window=60 , learning_rate=0.0001 , optimize='Adam' , loss_function='mean_squared_error' , function_activation='linear'):
+def validation_split(train_len , window=60 , size=VALIDATION) :
+
+    # the last part of the training range, in time order; None when too short to be worth holding out
+    samples = train_len - window
+    held = int(samples * size)
+    if held < MIN_VALIDATION :
+        return None
+
+    return train_len - held
 
-    model = Sequential()
-    model.add(LSTM(128 , return_sequences=True , input_shape = (window , 1)))
-    model.add(LSTM(64, return_sequences=False))
-    model.add(Dense(25 ,  activation = function_activation))
-    model.add(Dense(1))
+
+def make_optimizer(optimize='Adam' , learning_rate=0.0001) :
+    from keras.optimizers import Adam, SGD, RMSprop, Adagrad, Adadelta
 
     if optimize == "Adam" :
         optimizer = Adam(learning_rate=learning_rate)
@@ -82,54 +132,131 @@ def modelling(x_train , y_train , batch=1 , epoch=1 ,window=60 , learning_rate=0
 
         optimizer = Adadelta(learning_rate = learning_rate)
 
-    model.compile(optimizer=optimizer , loss=loss_function)
+    return optimizer
+
+
+def modelling(x_train , y_train=None , batch=FIT_MODES['quick']['batch'] , epoch=FIT_MODES['quick']['epoch'] ,window=60 , learning_rate=FIT_MODES['quick']['learning_rate'] , optimize='Adam' , loss_function='mean_squared_error' , function_activation='linear' ,
+              validation=None , callbacks=None):
+    from keras.models import Sequential
+    from keras.layers import Dense , LSTM
+
+    # x_train is a window array with y_train, or a batched (x, y) tf.data.Dataset on its own
+    n_features = x_train.shape[-1] if y_train is not None else x_train.element_spec[0].shape[-1]
+
+    model = Sequential()
+    model.add(LSTM(128 , return_sequences=True , input_shape = (window , n_features)))
+    model.add(LSTM(64, return_sequences=False))
+    model.add(Dense(25 ,  activation = function_activation))
+    model.add(Dense(1))
+
+    model.compile(optimizer=make_optimizer(optimize , learning_rate) , loss=loss_function)
 
-    model.fit(x_train, y_train, batch_size=batch, epochs=epoch)
+    if y_train is None :
+        model.fit(x_train, epochs=epoch, validation_data=validation, callbacks=callbacks)
+    else :
+        model.fit(x_train, y_train, batch_size=batch, epochs=epoch, validation_data=validation, callbacks=callbacks)
 
     return model
 
 
-def test_data (model , scaled_data , train_len , datasets , scaler , window=60) :
-        
-    test_data = scaled_data[train_len - window: , :]
-    # Create the data sets x_test and y_test
-    x_test = []
-    y_test = datasets[train_len:, :]
-    for i in range(window, len(test_data)):
-        x_test.append(test_data[i-window:i, 0])
+def update_model(ticker , datasets , train_len , key , params , epochs=UPDATE_EPOCHS) :
+
+    # fine-tunes the ticker's last model on the windows added since it was saved; None when a full fit is needed
+    match = {name : value for name , value in params.items() if name != "train_len"}
+    previous = model_registry.latest(ticker , match)
+    if previous is None :
+        return None
+
+    meta = previous["meta"]
+    rows , trained = meta.get("rows" , 0) , meta.get("train_len" , 0)
+
+    # restated history, a smaller split or too many stacked updates all go back to a full fit
+    if meta.get("updates" , 0) >= MAX_UPDATES or not 0 < rows < len(datasets) or trained > train_len :
+        return None
+    if model_registry.data_fingerprint(datasets[:rows]) != meta.get("data") :
+        return None
+
+    model , scaler = previous["model"] , previous["scaler"]
+    scaled = scaler.transform(datasets)
+    window = params["window"]
+
+    x_new = windowing.sliding_windows(scaled[trained - window:train_len - 1] , window)
+    y_new = scaled[trained:train_len , 0]
+
+    started = time.perf_counter()
+    if len(x_new) :
+        model.compile(optimizer=make_optimizer(params["optimize"] , params["learning_rate"]) , loss=params["loss_function"])
+        model.fit(x_new , y_new , batch_size=min(params["batch"] , len(x_new)) , epochs=epochs , verbose=0)
+    seconds = time.perf_counter() - started
+
+    report = {"epochs" : epochs if len(x_new) else 0 , "seconds" : seconds , "samples" : len(x_new) ,
+              "samples_per_sec" : len(x_new) * epochs / seconds if seconds else 0.0 , "val_loss" : None , "incremental" : True}
+
+    model_registry.save(key , model , scaler , meta=dict(params , ticker=ticker , rows=len(datasets) , data=model_registry.data_fingerprint(datasets) ,
+                                                      updates=meta.get("updates" , 0) + 1 , report=report))
+    model_registry.remove(previous["key"])
+
+    return model , {"scaled_data" : scaled , "scaler" : scaler , "report" : report}
+
+
+def fit_or_load(ticker , datasets , train_len , window=60 , scale='MinMaxScaler' , batch=32 , epoch=15 , learning_rate=0.001 , optimize='Adam' , loss_function='mean_squared_error' , function_activation='linear' , features=None ,
+                mode=None , patience=PATIENCE , incremental=True) :
+
+    # a fit mode overrides batch, epoch, learning rate and patience
+    if mode is not None :
+        settings = FIT_MODES[mode]
+        batch , epoch , learning_rate , patience = settings["batch"] , settings["epoch"] , settings["learning_rate"] , settings["patience"]
 
-    # Convert the data to a numpy array
-    x_test = np.array(x_test)
+    params = dict(features=features or feature_store.DEFAULT_FEATURES , train_len=train_len , window=window , scale=scale , batch=batch , epoch=epoch , learning_rate=learning_rate ,
+                  optimize=optimize , loss_function=loss_function , function_activation=function_activation , patience=patience)
+    key = model_registry.make_key(ticker , datasets , **params)
 
-    # Reshape the data
-    x_test = np.reshape(x_test, (x_test.shape[0], x_test.shape[1], 1 ))
+    entry = model_registry.load(key , lite=True)
+    if entry is not None :
+        scaler = entry['scaler']
+        return entry['model'] , {"scaled_data" : scaler.transform(datasets) , "scaler" : scaler , "report" : entry['meta'].get("report")}
+
+    if incremental :
+        updated = update_model(ticker , datasets , train_len , key , params)
+        if updated is not None :
+            return updated
+
+    scaled_data = scale_data(datasets=datasets , scale=scale)
+
+    split = validation_split(train_len , window=window)
+    stop = train_len if split is None else split
+
+    dataset = streaming_data(scaled_data["scaled_data"] , train_len=stop , window=window , batch=batch)
+    validation , callbacks = None , []
+    if split is not None :
+        validation = streaming_data(scaled_data["scaled_data"] , train_len=train_len , window=window , batch=max(batch , 256) , start=split , shuffle=False)
+        callbacks = fit_callbacks(patience)
+
+    report = fit_report(samples=stop - window)
+    model = modelling(dataset , batch=batch , epoch=epoch , window=window , learning_rate=learning_rate ,
+                      optimize=optimize , loss_function=loss_function , function_activation=function_activation ,
+                      validation=validation , callbacks=callbacks + [report])
+
+    scaled_data["report"] = report.report
+    model_registry.save(key , model , scaled_data['scaler'] , meta=dict(params , ticker=ticker , rows=len(datasets) ,
+                                                                           data=model_registry.data_fingerprint(datasets) , updates=0 , report=report.report))
+
+    return model , scaled_data
+
+
+def test_data (model , scaled_data , train_len , datasets , scaler , window=60) :
+        
+    x_test = windowing.test_windows(scaled_data , train_len=train_len , window=window)
 
     # Get the models predicted price values
     predictions = model.predict(x_test)
-    predictions = scaler.inverse_transform(predictions)
+    predictions = forecast_engine.inverse_target(scaler , predictions).reshape(-1 , 1)
 
     return predictions
 
 
 
-def meramal(scaled_data, model, scaler, days , window=60):
-    ramalan = []
+def meramal(scaled_data, model, scaler, days , window=60 , features=None):
 
-    # Ambil data 60 hari terakhir
-    data = scaled_data[-window:]
-    
-    for _ in range(days):
-        data_temp = data.reshape(1, -1, 1)
-        
-        # Lakukan prediksi
-        predict = model.predict(data_temp)
-        
-        # Transformasi hasil prediksi ke skala asli
-        predict_transformed = scaler.inverse_transform(predict)
-        ramalan.append(predict_transformed[0, 0])
-        
-        # Update data untuk prediksi berikutnya
-        # Tambahkan prediksi ke data dan hapus elemen pertama
-        data = np.concatenate((data[1:], predict), axis=0)
-    
-    return np.array(ramalan).reshape(-1)
+    # whole horizon in one traced rollout instead of one predict() per day
+    return forecast_engine.forecast(model , scaled_data , scaler , days , window=window , features=features)
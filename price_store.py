@@ -0,0 +1,194 @@
+import os
+import json
+import datetime
+import threading
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "prices")
+
+# yfinance reports a failed request as an empty frame; only a range this short (weekend, holidays) may really have no bars
+EMPTY_DAYS = 7
+# every top-up re-reads this many stored days, adjusted prices that moved mean a split or dividend re-based the history
+OVERLAP_DAYS = 10
+
+# one lock per ticker: concurrent loads of different tickers fetch in parallel, the same ticker never twice
+_lock = threading.Lock()
+_ticker_locks = {}
+
+def _ticker_lock(ticker) :
+    with _lock :
+        return _ticker_locks.setdefault(ticker , threading.Lock())
+
+
+def yahoo_fetcher(ticker , start , end) :
+    # adjusted as of today, load_prices notices when that re-bases bars it already stored
+    data = yf.download(ticker , start=start , end=end , progress=False , auto_adjust=True)
+
+    # yfinance >= 0.2.48 returns (Price, Ticker) columns even for one symbol
+    if isinstance(data.columns , pd.MultiIndex) :
+        data.columns = data.columns.get_level_values(0)
+    data.index.name = 'Date'
+
+    return data
+
+def yahoo_batch_fetcher(tickers , start , end) :
+    # one yf.download for many symbols, split back into one frame per ticker
+    data = yf.download(list(tickers) , start=start , end=end , progress=False , auto_adjust=True , group_by='column')
+    data.index.name = 'Date'
+
+    frames = {}
+    for ticker in tickers :
+        if isinstance(data.columns , pd.MultiIndex) and ticker in data.columns.get_level_values(1) :
+            frame = data.xs(ticker , axis=1 , level=1).dropna(how='all')
+            frame.columns.name = None
+            frames[ticker] = frame
+
+    return frames
+
+_fetcher = yahoo_fetcher
+_batch_fetcher = yahoo_batch_fetcher
+
+def set_fetcher(fetcher , batch_fetcher=None) :
+    # fetcher(ticker, start, end) -> OHLCV frame indexed by Date, end exclusive
+    # batch_fetcher(tickers, start, end) -> {ticker: frame}; without one, every ticker is fetched on its own
+    global _fetcher , _batch_fetcher
+    _fetcher , _batch_fetcher = fetcher , batch_fetcher
+
+def get_fetcher() :
+    return _fetcher
+
+def get_batch_fetcher() :
+    return _batch_fetcher
+
+
+def _day(value) :
+    return pd.Timestamp(value).normalize()
+
+def _paths(ticker , root) :
+    name = ticker.replace(os.sep , "_")
+    return os.path.join(root , f"{name}.parquet") , os.path.join(root , f"{name}.json")
+
+
+def read_store(ticker , root=STORE_DIR) :
+    data_path , meta_path = _paths(ticker , root)
+
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)) :
+        return None , None
+
+    data = pd.read_parquet(data_path)
+    with open(meta_path) as f :
+        meta = json.load(f)
+
+    return data , (_day(meta['start']) , _day(meta['end']))
+
+def read_coverage(ticker , root=STORE_DIR) :
+    # coverage only, without loading the prices
+    _ , meta_path = _paths(ticker , root)
+    if not os.path.exists(meta_path) :
+        return None
+
+    with open(meta_path) as f :
+        meta = json.load(f)
+    return _day(meta['start']) , _day(meta['end'])
+
+def write_store(ticker , data , coverage , root=STORE_DIR) :
+    os.makedirs(root , exist_ok=True)
+    data_path , meta_path = _paths(ticker , root)
+
+    # data first, coverage second: a reader in between only refetches, never misses rows
+    tmp = f"{data_path}.{os.getpid()}.tmp"
+    data.to_parquet(tmp)
+    os.replace(tmp , data_path)
+
+    tmp = f"{meta_path}.{os.getpid()}.tmp"
+    with open(tmp , "w") as f :
+        json.dump({"start" : coverage[0].isoformat() , "end" : coverage[1].isoformat()} , f)
+    os.replace(tmp , meta_path)
+
+
+def missing_ranges(coverage , start , end) :
+    if coverage is None :
+        return [(start , end)]
+
+    ranges = []
+    if start < coverage[0] :
+        ranges.append((start , coverage[0]))
+    if end > coverage[1] :
+        ranges.append((coverage[1] , end))
+
+    return ranges
+
+def answered(data , start , end) :
+    return (data is not None and not data.empty) or (end - start).days <= EMPTY_DAYS
+
+def fetch_range(coverage , lo , hi , overlap=OVERLAP_DAYS) :
+    # a missing range widened into the covered side it touches
+    if coverage is None :
+        return lo , hi
+    if hi == coverage[0] :
+        return lo , min(hi + pd.Timedelta(days=overlap) , coverage[1])
+    return max(lo - pd.Timedelta(days=overlap) , coverage[0]) , hi
+
+def rebased(stored , fetched) :
+    if stored is None or stored.empty or fetched is None or fetched.empty or 'Close' not in fetched :
+        return False
+
+    common = stored.index.intersection(fetched.index)
+    return not np.allclose(stored.loc[common , 'Close'].values , fetched.loc[common , 'Close'].values , rtol=1e-6 , equal_nan=True)
+
+def merge_prices(frames) :
+    frames = [f for f in frames if f is not None and not f.empty]
+    if not frames :
+        return pd.DataFrame()
+
+    data = pd.concat(frames)
+    data = data[~data.index.duplicated(keep='last')].sort_index()
+    data.index.name = 'Date'
+
+    return data
+
+
+def load_prices(ticker , start , end , fetcher=None , root=STORE_DIR) :
+    fetcher = fetcher or _fetcher
+    start , end = _day(start) , _day(end)
+
+    with _ticker_lock(ticker) :
+        data , coverage = read_store(ticker , root)
+        ranges = missing_ranges(coverage , start , end)
+
+        if ranges :
+            spans = [(lo , hi) + fetch_range(coverage , lo , hi) for lo , hi in ranges]
+            fetched = [(lo , hi , fetcher(ticker , a , b)) for lo , hi , a , b in spans]
+
+            if any(rebased(data , frame) for _ , _ , frame in fetched) :
+                # the stored bars no longer match Yahoo's adjusted history, drop them and refetch the whole span once
+                lo , hi = min(start , coverage[0]) , max(end , coverage[1])
+                data , coverage , spans = None , None , [(lo , hi , lo , hi)]
+                fetched = [(lo , hi , fetcher(ticker , lo , hi))]
+
+            # only ranges that actually answered become covered, an empty answer is refetched next time;
+            # before the first stored bar an empty answer is a ticker that was not listed yet
+            first = None if data is None or data.empty else data.index[0]
+            covered = coverage
+            for (lo , hi , frame) , (_ , _ , a , b) in zip(fetched , spans) :
+                unlisted = coverage is not None and hi == coverage[0] and first is not None and first >= b
+                if answered(frame , a , b) or unlisted :
+                    covered = (lo , hi) if covered is None else (min(lo , covered[0]) , max(hi , covered[1]))
+
+            data = merge_prices([data] + [frame for _ , _ , frame in fetched])
+
+            if covered is not None and (coverage is None or covered != coverage) :
+                # today's bar is still moving, so it never counts as covered
+                today = _day(datetime.date.today())
+                covered = (covered[0] , min(covered[1] , today))
+
+                if covered[1] > covered[0] :
+                    write_store(ticker , data , covered , root)
+
+    if data is None or data.empty :
+        return pd.DataFrame()
+
+    return data[(data.index >= start) & (data.index < end)].copy()
@@ -0,0 +1,172 @@
+import os
+import json
+import weakref
+import time
+import inspect
+import functools
+import threading
+import tracemalloc
+import contextlib
+import pandas as pd
+
+
+# set APP_PROFILE=1 to have the app's profiling toggle on by default
+DEFAULT_ON = os.environ.get("APP_PROFILE") == "1"
+
+# one recorder per script thread, a Streamlit rerun never sees another session's spans
+_local = threading.local()
+
+# recorders tracking memory; tracemalloc is process-wide, so it runs only while one of them is alive and on
+_tracing = weakref.WeakSet()
+_tracing_lock = threading.Lock()
+
+
+class _Recorder :
+
+    def __init__(self , enabled=False , memory=False , spans=None , depth=0 , started=None) :
+        self.enabled , self.memory = enabled , memory
+        self.spans , self.depth = [] if spans is None else spans , depth
+        self.started = time.perf_counter() if started is None else started
+
+
+def _state() :
+    if not hasattr(_local , "recorder") :
+        _local.recorder = _Recorder()
+    return _local.recorder
+
+
+def _track_memory(state , memory) :
+    with _tracing_lock :
+        if memory :
+            _tracing.add(state)
+        else :
+            _tracing.discard(state)
+
+        if _tracing and not tracemalloc.is_tracing() :
+            tracemalloc.start()
+        elif not _tracing and tracemalloc.is_tracing() :
+            tracemalloc.stop()
+
+
+def enable(memory=False) :
+    state = _state()
+    state.enabled , state.memory = True , memory
+    _track_memory(state , memory)
+
+def disable() :
+    state = _state()
+    state.enabled , state.memory = False , False
+    _track_memory(state , False)
+
+def enabled() :
+    return _state().enabled
+
+def reset() :
+    state = _state()
+    state.spans , state.depth , state.started = [] , 0 , time.perf_counter()
+
+def carry() :
+    # initializer for worker threads: they record into the caller's spans, nested under the calling function
+    state = _state()
+    enabled , memory , spans , depth , started = state.enabled , state.memory , state.spans , state.depth + 1 , state.started
+
+    def attach() :
+        _local.recorder = _Recorder(enabled , memory , spans , depth , started)
+
+    return attach
+
+
+@contextlib.contextmanager
+def span(name) :
+    state = _state()
+    if not state.enabled :
+        yield
+        return
+
+    memory = state.memory and tracemalloc.is_tracing()
+    before = tracemalloc.get_traced_memory()[0] if memory else 0
+    state.depth += 1
+    started = time.perf_counter()
+
+    try :
+        yield
+    finally :
+        elapsed = time.perf_counter() - started
+        state.depth -= 1
+        state.spans.append({"name" : name , "start" : started - state.started , "seconds" : elapsed , "depth" : state.depth ,
+                            "memory" : tracemalloc.get_traced_memory()[0] - before if memory else None , "thread" : threading.get_ident()})
+
+
+def profiled(func , name=None) :
+    # a single flag check when profiling is off
+    if getattr(func , "__profiled__" , False) :
+        return func
+    name = name or f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args , **kwargs) :
+        if not _state().enabled :
+            return func(*args , **kwargs)
+        with span(name) :
+            return func(*args , **kwargs)
+
+    wrapper.__profiled__ = True
+    return wrapper
+
+def instrument(*modules) :
+    # wraps every public function defined in each module in place; callers look them up at call time
+    for module in modules :
+        for attr , value in list(vars(module).items()) :
+            if attr.startswith("_") or not inspect.isfunction(value) or value.__module__ != module.__name__ :
+                continue
+            setattr(module , attr , profiled(value))
+
+
+def summary() :
+    spans = pd.DataFrame(_state().spans , columns=["name" , "start" , "seconds" , "depth" , "memory"])
+    if spans.empty :
+        return pd.DataFrame(columns=["calls" , "total ms" , "mean ms" , "max ms" , "memory KB"])
+
+    grouped = spans.groupby("name")
+    table = pd.DataFrame({"calls" : grouped.size() ,
+                          "total ms" : grouped.seconds.sum() * 1000 ,
+                          "mean ms" : grouped.seconds.mean() * 1000 ,
+                          "max ms" : grouped.seconds.max() * 1000 ,
+                          "memory KB" : grouped.memory.sum(min_count=1) / 1024})
+    return table.sort_values("total ms" , ascending=False)
+
+def elapsed() :
+    return time.perf_counter() - _state().started
+
+def top_level_seconds() :
+    return sum(s["seconds"] for s in _state().spans if s["depth"] == 0)
+
+
+def chrome_trace() :
+    # complete ("X") events in microseconds, loads in chrome://tracing or Perfetto
+    events = [{"name" : s["name"] , "cat" : s["name"].split(".")[0] , "ph" : "X" ,
+               "ts" : s["start"] * 1e6 , "dur" : s["seconds"] * 1e6 , "pid" : os.getpid() , "tid" : s["thread"] ,
+               "args" : {} if s["memory"] is None else {"memory_delta_bytes" : s["memory"]}}
+              for s in _state().spans]
+    return {"traceEvents" : events , "displayTimeUnit" : "ms"}
+
+def dump(path) :
+    with open(path , "w") as f :
+        json.dump(chrome_trace() , f)
+    return path
+
+
+def render_panel() :
+    # collapsible per-rerun timing table; whatever the instrumented functions do not cover is Streamlit and page code
+    import streamlit as st
+
+    total , covered = elapsed() , top_level_seconds()
+
+    with st.expander(f"⏱ Profiling : rerun {total * 1000:.0f} ms") :
+        col1 , col2 , col3 = st.columns(3)
+        col1.metric("Rerun" , f"{total * 1000:.0f} ms")
+        col2.metric("Instrumented" , f"{covered * 1000:.0f} ms")
+        col3.metric("Streamlit & other" , f"{max(total - covered , 0) * 1000:.0f} ms")
+
+        st.dataframe(summary().round(2) , use_container_width=True)
+        st.download_button("Download Chrome trace" , data=json.dumps(chrome_trace()) , file_name="rerun_trace.json" , mime="application/json")
@@ -0,0 +1,45 @@
+import time
+import contextlib
+import streamlit as st
+
+
+class PipelineProgress :
+    # progress bar advanced by real pipeline stages, with wall time per stage
+
+    def __init__(self , stages , weights=None) :
+        self.stages = list(stages)
+        self.weights = dict(zip(self.stages , weights or [1] * len(self.stages)))
+        self.total = sum(self.weights.values())
+        self.done = 0
+        self.current = None
+        self.started = None
+        self.timings = {}
+        self.bar = st.progress(0 , text="Starting ...")
+
+    def _close(self) :
+        if self.current is not None :
+            elapsed = time.perf_counter() - self.started
+            self.timings[self.current] = self.timings.get(self.current , 0) + elapsed
+            self.done += self.weights.get(self.current , 0)
+            self.current = None
+
+    def start(self , name) :
+        self._close()
+        self.current = name
+        self.started = time.perf_counter()
+        self.bar.progress(min(self.done / self.total , 1.0) , text=f"{name.capitalize()} ...")
+
+    @contextlib.contextmanager
+    def stage(self , name) :
+        self.start(name)
+        try :
+            yield
+        finally :
+            self._close()
+
+    def summary(self) :
+        return " · ".join(f"{name} {seconds * 1000:.0f} ms" for name , seconds in self.timings.items())
+
+    def finish(self) :
+        self._close()
+        self.bar.progress(1.0 , text=f"Done in {sum(self.timings.values()):.2f} s ({self.summary()})")
@@ -0,0 +1,96 @@
+import os
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import price_store
+import fetcher
+import metrics
+
+
+BATCH_SIZE = 32
+ATR_WINDOW = 14
+
+
+def last_atr(high , low , close , window=ATR_WINDOW) :
+    # same true range as preprocessing.calculate_atr, only the latest value
+    prev_close = np.concatenate(([np.nan] , close[:-1]))
+    true_range = np.fmax(high - low , np.fmax(np.abs(high - prev_close) , np.abs(low - prev_close)))
+
+    if len(true_range) < window :
+        return np.nan
+    return true_range[-window:].mean()
+
+
+def screen_ticker(ticker , start , end) :
+    data = price_store.load_prices(ticker , start=start , end=end)
+    if len(data) < 2 :
+        raise ValueError("not enough price history")
+
+    close = data['Close'].values.astype(np.float64)
+    summary = metrics.compute_metrics(metrics.returns_from_prices(close))
+
+    return {
+        "Ticker" : ticker.replace(".JK" , "") ,
+        "Last Close" : close[-1] ,
+        "Return (%)" : (close[-1] / close[0] - 1) * 100 ,
+        "Volatility (ann.)" : summary.volatility * np.sqrt(metrics.PERIODS) ,
+        "Sharpe" : summary.sharpe ,
+        "Sortino" : summary.sortino ,
+        "Max Drawdown (%)" : summary.max_drawdown * 100 ,
+        f"ATR {ATR_WINDOW}" : last_atr(data['High'].values , data['Low'].values , close) ,
+    }
+
+def _offline(ticker , start , end) :
+    raise fetcher.FetchError("not in the price store")
+
+def _init_worker() :
+    # workers only read what screen_universe already downloaded, they never reach Yahoo unthrottled
+    price_store.set_fetcher(_offline)
+
+
+def screen_batch(tickers , start , end) :
+    rows , errors = [] , {}
+
+    for ticker in tickers :
+        try :
+            rows.append(screen_ticker(ticker , start , end))
+        except Exception as error :
+            errors[ticker] = str(error)
+
+    return rows , errors
+
+
+def screen_universe(tickers , start , end , workers=None , batch_size=BATCH_SIZE , progress=None) :
+    # network first: batched, rate limited and retried downloads fill the price store,
+    # then the process pool computes from the store without touching the network
+    # today's bar is never stored as covered, so a later end would send every worker back to Yahoo
+    end = min(pd.Timestamp(end).normalize() , pd.Timestamp.today().normalize())
+    report = None if progress is None else (lambda done : progress(done / 2))
+    frames , errors = fetcher.fetch_many(tickers , start , end , progress=report)
+
+    tickers = list(frames)
+    batches = [tickers[i:i + batch_size] for i in range(0 , len(tickers) , batch_size)]
+    workers = max(1 , min(workers or os.cpu_count() or 1 , len(batches)))
+
+    rows = []
+    if not batches :
+        return pd.DataFrame() , errors
+
+    # spawn, not fork: the Streamlit server that calls this has live threads
+    with ProcessPoolExecutor(max_workers=workers , mp_context=multiprocessing.get_context("spawn") , initializer=_init_worker) as pool :
+        futures = [pool.submit(screen_batch , batch , start , end) for batch in batches]
+
+        for done , future in enumerate(as_completed(futures) , start=1) :
+            batch_rows , batch_errors = future.result()
+            rows.extend(batch_rows)
+            errors.update(batch_errors)
+
+            if progress is not None :
+                progress(0.5 + done / len(futures) / 2)
+
+    table = pd.DataFrame(rows)
+    if not table.empty :
+        table = table.sort_values("Sharpe" , ascending=False).reset_index(drop=True)
+
+    return table , errors
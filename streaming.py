@@ -0,0 +1,31 @@
+import numpy as np
+
+
+SHUFFLE_BUFFER = 10000
+
+
+def window_dataset(scaled_data , start , stop , window , batch , shuffle=True , shuffle_buffer=SHUFFLE_BUFFER , target=0 , seed=None) :
+    # targets are rows [start, stop), each with the window rows before it; windows are cut per batch
+    import tensorflow as tf
+
+    series = tf.constant(np.asarray(scaled_data , dtype=np.float32))
+    rows = tf.data.Dataset.range(max(start , window) , stop)
+
+    if shuffle :
+        rows = rows.shuffle(max(1 , min(shuffle_buffer , stop - start)) , seed=seed , reshuffle_each_iteration=True)
+
+    offsets = tf.range(-window , 0 , dtype=tf.int64)
+
+    def gather(batch_rows) :
+        x = tf.gather(series , batch_rows[: , None] + offsets[None , :])
+        y = tf.gather(series[: , target] , batch_rows)
+        return x , y
+
+    return rows.batch(batch).map(gather , num_parallel_calls=tf.data.AUTOTUNE).prefetch(tf.data.AUTOTUNE)
+
+
+def generator_dataset(generator , output_signature) :
+    # wraps a Python batch generator so batches are produced ahead of the training step
+    import tensorflow as tf
+
+    return tf.data.Dataset.from_generator(generator , output_signature=output_signature).prefetch(tf.data.AUTOTUNE)
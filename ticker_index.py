@@ -0,0 +1,94 @@
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+
+FUZZY_CUTOFF = 0.4
+FUZZY_CANDIDATES = 50
+
+
+def _grams(text , n=2) :
+    # padded bigrams, so word starts and ends count too
+    text = f" {text} "
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class TickerIndex :
+    # built once; prefix via bisect over sorted keys, substring and typo lookups via a bigram index
+
+    def __init__(self , frame , ticker_col='Ticker' , name_col='Company Name') :
+        self.frame = frame.reset_index(drop=True)
+        self.tickers = [str(t).upper() for t in self.frame[ticker_col]]
+        self.names = [str(n) for n in self.frame[name_col]]
+        self.text = [f"{t.lower()} {n.lower()}" for t , n in zip(self.tickers , self.names)]
+        self.position = {t : i for i , t in enumerate(self.tickers)}
+
+        keys = [(t.lower() , i) for i , t in enumerate(self.tickers)]
+        keys += [(word , i) for i , name in enumerate(self.names) for word in name.lower().split()]
+        keys.sort()
+        self.prefix_keys = [k for k , _ in keys]
+        self.prefix_rows = [i for _ , i in keys]
+
+        self.ticker_grams = [_grams(t.lower()) for t in self.tickers]
+        self.name_grams = [_grams(n.lower()) for n in self.names]
+
+        self.grams = defaultdict(set)
+        for i , text in enumerate(self.text) :
+            for gram in _grams(text) | self.ticker_grams[i] | self.name_grams[i] :
+                self.grams[gram].add(i)
+
+    def __len__(self) :
+        return len(self.tickers)
+
+    def exact(self , query) :
+        row = self.position.get(query.strip().upper())
+        return [] if row is None else [row]
+
+    def prefix(self , query) :
+        query = query.strip().lower()
+        lo = bisect_left(self.prefix_keys , query)
+        hi = bisect_left(self.prefix_keys , query + "￿")
+        return list(dict.fromkeys(self.prefix_rows[lo:hi]))
+
+    def substring(self , query) :
+        query = query.strip().lower()
+        if len(query) < 2 :
+            candidates = range(len(self.text))
+        else :
+            grams = [self.grams.get(query[i:i + 2] , set()) for i in range(len(query) - 1)]
+            candidates = sorted(set.intersection(*grams))
+
+        return [i for i in candidates if query in self.text[i]]
+
+    def fuzzy(self , query , cutoff=FUZZY_CUTOFF) :
+        # bigram Dice similarity against the ticker and the company name, best of both
+        grams = _grams(query.strip().lower())
+        votes = Counter()
+        for gram in grams :
+            votes.update(self.grams.get(gram , ()))
+
+        scored = []
+        for i , _ in votes.most_common(FUZZY_CANDIDATES) :
+            score = max(2 * len(grams & self.ticker_grams[i]) / (len(grams) + len(self.ticker_grams[i])) ,
+                        2 * len(grams & self.name_grams[i]) / (len(grams) + len(self.name_grams[i])))
+            if score >= cutoff :
+                scored.append((score , i))
+
+        return [i for _ , i in sorted(scored , key=lambda item : -item[0])]
+
+    def search(self , query , limit=20) :
+        # exact ticker, then prefixes, then substrings, then typo-tolerant matches
+        if not query.strip() :
+            return []
+
+        rows = self.exact(query) + self.prefix(query) + self.substring(query)
+        if len(rows) < limit :
+            rows += self.fuzzy(query)
+
+        return list(dict.fromkeys(rows))[:limit]
+
+    def lookup(self , query , limit=20) :
+        return self.frame.iloc[self.search(query , limit=limit)]
+
+    def label(self , ticker) :
+        row = self.position.get(ticker.replace(".JK" , "").upper())
+        return ticker if row is None else f"{self.tickers[row]} · {self.names[row]}"
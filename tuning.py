@@ -0,0 +1,233 @@
+import os
+import pickle
+import shutil
+import hashlib
+import tempfile
+import itertools
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+SEARCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "search")
+
+SPACE = {
+    "window" : [20 , 40 , 60 , 80 , 100 , 120 , 140 , 180] ,
+    "optimize" : ["Adam" , "SGD" , "RMSprop" , "Adagrad" , "Adadelta"] ,
+    "learning_rate" : [0.1 , 0.01 , 0.001 , 0.0001] ,
+    "batch" : [16 , 32 , 64 , 128 , 256] ,
+    "loss_function" : ["mean_squared_error" , "mean_absolute_error" , "huber_loss" , "mean_absolute_percentage_error"] ,
+    "function_activation" : ["relu" , "sigmoid" , "tanh" , "linear"] ,
+    "scale" : ["StandardScaler" , "MinMaxScaler" , "RobustScaler"] ,
+}
+DEFAULTS = dict(window=60 , optimize="Adam" , learning_rate=0.001 , batch=32 , loss_function="mean_squared_error" ,
+                function_activation="linear" , scale="MinMaxScaler")
+ETA = 3
+
+
+def grid(space) :
+    names = list(space)
+    return [dict(DEFAULTS , **dict(zip(names , values))) for values in itertools.product(*(space[n] for n in names))]
+
+def sample(space , trials , seed=None) :
+    # distinct random configurations, never more than the grid holds
+    configs = grid(space)
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(configs) , size=min(trials , len(configs)) , replace=False)
+    return [configs[i] for i in picks]
+
+
+def prepare(datasets , scales , root=SEARCH_DIR) :
+    # every scaler's output is written once as .npy; trials memmap it and cut windows as strided views.
+    # search() and successive_halving() pass a per-search directory and remove it afterwards
+    values = np.ascontiguousarray(datasets , dtype=np.float32)
+    digest = hashlib.blake2b(values.tobytes() , digest_size=12).hexdigest()
+    base = os.path.join(root , digest)
+    os.makedirs(base , exist_ok=True)
+
+    target = os.path.join(base , "target.npy")
+    if not os.path.exists(target) :
+        np.save(target , values[: , 0])
+
+    import preprocessing_model
+
+    paths = {}
+    for scale in scales :
+        scaled , scaler = os.path.join(base , f"{scale}.npy") , os.path.join(base , f"{scale}.pkl")
+        if not os.path.exists(scaled) :
+            result = preprocessing_model.scale_data(values , scale=scale)
+            with open(scaler , "wb") as f :
+                pickle.dump(result["scaler"] , f)
+            np.save(scaled , result["scaled_data"].astype(np.float32))
+        paths[scale] = (scaled , scaler)
+
+    return base , target , paths
+
+
+def _init_worker(threads) :
+    # runs before TensorFlow is imported in the worker, so the pool never oversubscribes the cores
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
+
+
+def run_trial(trial) :
+    import preprocessing_model
+    import forecast_engine
+    import windowing
+    from keras.models import load_model
+    from sklearn.metrics import mean_absolute_error , mean_squared_error , mean_absolute_percentage_error
+
+    config , train_len = trial["config"] , trial["train_len"]
+    window = config["window"]
+
+    scaled = np.load(trial["scaled"] , mmap_mode='r')
+    target = np.load(trial["target"] , mmap_mode='r')
+    with open(trial["scaler"] , "rb") as f :
+        scaler = pickle.load(f)
+
+    # trials are pruned and ranked on the end of the training range, the test split is only reported
+    split = preprocessing_model.validation_split(train_len , window=window)
+    if split is None :
+        raise ValueError("training range too short to hold out a validation slice")
+
+    x_train , y_train = windowing.train_windows(scaled , train_len=split , window=window)
+    x_val , y_val = windowing.train_windows(scaled , train_len=train_len , window=window)
+    validation = (x_val[split - window:] , y_val[split - window:])
+    callbacks = preprocessing_model.fit_callbacks(trial["patience"])
+
+    if trial.get("resume") and os.path.exists(trial["resume"]) :
+        # successive halving: later rungs continue from the previous rung's weights
+        model = load_model(trial["resume"])
+        model.fit(x_train , y_train , batch_size=config["batch"] , epochs=trial["epochs"] , validation_data=validation , callbacks=callbacks , verbose=0)
+    else :
+        model = preprocessing_model.modelling(x_train , y_train , batch=config["batch"] , epoch=trial["epochs"] , window=window ,
+                                              learning_rate=config["learning_rate"] , optimize=config["optimize"] ,
+                                              loss_function=config["loss_function"] , function_activation=config["function_activation"] ,
+                                              validation=validation , callbacks=callbacks)
+
+    if trial.get("checkpoint") :
+        model.save(trial["checkpoint"])
+
+    x_test = windowing.test_windows(scaled , train_len=train_len , window=window)
+    predict = forecast_engine.inverse_target(scaler , model.predict(x_test , verbose=0))
+    truth = np.asarray(target[train_len:] , dtype=np.float64)
+    val_predict = forecast_engine.inverse_target(scaler , model.predict(validation[0] , verbose=0))
+    val_truth = np.asarray(target[split:train_len] , dtype=np.float64)
+
+    if not (np.all(np.isfinite(predict)) and np.all(np.isfinite(val_predict))) :
+        raise ValueError("model diverged")
+
+    return {"val_RMSE" : np.sqrt(mean_squared_error(val_truth , val_predict)) ,
+            "RMSE" : np.sqrt(mean_squared_error(truth , predict)) ,
+            "MAE" : mean_absolute_error(truth , predict) ,
+            "MAPE" : mean_absolute_percentage_error(truth , predict)}
+
+
+def _safe_trial(trial) :
+    try :
+        return trial["id"] , run_trial(trial) , None
+    except Exception as error :
+        return trial["id"] , None , str(error)
+
+
+def run_trials(trials , workers=None , progress=None) :
+    # spawned workers, at most one per core, each TensorFlow limited to its share of the cores
+    cores = os.cpu_count() or 1
+    workers = max(1 , min(workers or cores , cores , len(trials)))
+    results , errors = {} , {}
+
+    with ProcessPoolExecutor(max_workers=workers , mp_context=multiprocessing.get_context("spawn") ,
+                             initializer=_init_worker , initargs=(max(1 , cores // workers) ,)) as pool :
+        futures = [pool.submit(_safe_trial , trial) for trial in trials]
+
+        for done , future in enumerate(as_completed(futures) , start=1) :
+            trial_id , scores , error = future.result()
+            if error is None :
+                results[trial_id] = scores
+            else :
+                errors[trial_id] = error
+
+            if progress is not None :
+                progress(done / len(futures))
+
+    return results , errors
+
+
+def _trials(configs , datasets , train_len , epochs , patience , root , checkpoints=None , resume=False) :
+    _ , target , paths = prepare(datasets , {c["scale"] for _ , c in configs} , root=root)
+    trials = []
+
+    for i , config in configs :
+        scaled , scaler = paths[config["scale"]]
+        checkpoint = os.path.join(checkpoints , f"trial-{i}.keras") if checkpoints else None
+        trials.append({"id" : i , "config" : config , "scaled" : scaled , "scaler" : scaler , "target" : target ,
+                       "train_len" : train_len , "epochs" : epochs , "patience" : patience ,
+                       "checkpoint" : checkpoint , "resume" : resume and checkpoint})
+
+    return trials
+
+
+def leaderboard(configs , results) :
+    rows = [dict(config , **results[i]) for i , config in configs if i in results]
+    table = pd.DataFrame(rows)
+    if not table.empty :
+        table = table.sort_values("val_RMSE").reset_index(drop=True)
+
+    return table
+
+
+def _workdir(root) :
+    os.makedirs(root , exist_ok=True)
+    return tempfile.mkdtemp(prefix="search-" , dir=root)
+
+
+def search(datasets , train_len , configs , epochs=10 , patience=3 , workers=None , progress=None , root=SEARCH_DIR) :
+    # grid or random search: every configuration gets the full epoch budget
+    indexed = list(enumerate(configs))
+    workdir = _workdir(root)
+    try :
+        results , errors = run_trials(_trials(indexed , datasets , train_len , epochs , patience , workdir) , workers=workers , progress=progress)
+    finally :
+        shutil.rmtree(workdir , ignore_errors=True)
+
+    return leaderboard([(i , dict(c , epochs=epochs)) for i , c in indexed] , results) , errors
+
+
+def successive_halving(datasets , train_len , configs , min_epochs=1 , max_epochs=27 , eta=ETA , patience=3 , workers=None , progress=None , root=SEARCH_DIR) :
+    # every rung trains the survivors eta times longer and keeps the best 1/eta of them
+    survivors = list(enumerate(configs))
+    rungs = max(1 , int(np.floor(np.log(max_epochs / min_epochs) / np.log(eta))) + 1)
+    trained , epochs = 0 , min_epochs
+    errors , scored = {} , {}
+
+    # scaled inputs and checkpoints of every rung live in one directory, removed when the search ends
+    workdir = _workdir(root)
+    checkpoints = os.path.join(workdir , "checkpoints")
+    os.makedirs(checkpoints)
+
+    try :
+        for rung in range(rungs) :
+            step = epochs - trained
+            report = None if progress is None else (lambda done , rung=rung : progress((rung + done) / rungs))
+            results , rung_errors = run_trials(_trials(survivors , datasets , train_len , step , patience , workdir ,
+                                                       checkpoints=checkpoints , resume=rung > 0) , workers=workers , progress=report)
+            errors.update(rung_errors)
+            for i , _ in survivors :
+                if i in results :
+                    scored[i] = (epochs , results[i])
+
+            ranked = sorted((i for i , _ in survivors if i in results) , key=lambda i : results[i]["val_RMSE"])
+            keep = set(ranked[:max(1 , len(ranked) // eta)])
+            survivors = [(i , c) for i , c in survivors if i in keep]
+
+            trained , epochs = epochs , min(max_epochs , epochs * eta)
+            if not survivors or trained >= max_epochs :
+                break
+    finally :
+        shutil.rmtree(workdir , ignore_errors=True)
+
+    # pruned configurations stay on the board with the score of the last rung they reached
+    indexed = [(i , dict(configs[i] , epochs=scored[i][0])) for i in scored]
+    return leaderboard(indexed , {i : scored[i][1] for i in scored}) , errors
@@ -0,0 +1,33 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def sliding_windows(values , window) :
+    # (samples, window, features) view over values, nothing is copied
+    values = np.asarray(values)
+    if values.ndim == 1 :
+        values = values[: , None]
+
+    if len(values) < window :
+        return np.empty((0 , window , values.shape[1]) , dtype=values.dtype)
+
+    return sliding_window_view(values , window , axis=0).transpose(0 , 2 , 1)
+
+
+def train_windows(scaled_data , train_len , window , target=0) :
+    # x[i] = rows [i, i + window), y[i] = row i + window, for targets before train_len
+    x_train = sliding_windows(scaled_data[:train_len - 1] , window)
+    y_train = scaled_data[window:train_len , target]
+
+    return x_train , y_train
+
+def test_windows(scaled_data , train_len , window) :
+    # one window per row from train_len onward
+    x_test = sliding_windows(scaled_data[train_len - window:-1] , window)
+
+    return x_test
+
+
+def materialize(windows , dtype=None) :
+    # contiguous copy, only for backends that cannot consume strided views
+    return np.ascontiguousarray(windows , dtype=dtype)